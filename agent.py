@@ -14,16 +14,153 @@ Features:
 - Debug/development mode
 """
 
-import os, json, datetime
-from typing import Dict, Any, Callable
+import os, sys, json, datetime, time, threading, queue, atexit, collections, functools, itertools, hashlib, importlib.util, asyncio
+import logging, logging.handlers
+from typing import Dict, Any, Callable, List, Union, NamedTuple, FrozenSet, Tuple
 
-# Choose the appropriate TOML library based on Python version
+# Use orjson for response parsing and log serialization when it is installed
+# ('pip install orjson'), falling back to the standard library otherwise
 try:
-    import tomllib  # Python 3.11+
+    import orjson
+    
+    _json_loads = orjson.loads
+    
+    def _json_dumps(data: Any) -> str:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
 except ImportError:
-    import tomli as tomllib  # Python 3.10 and below, requires 'pip install tomli'
+    _json_loads = json.loads
+    
+    def _json_dumps(data: Any) -> str:
+        return json.dumps(data, ensure_ascii=False, indent=2)
+
+# Buffer size of the log file handle and how many bytes the log writer may
+# accumulate before forcing a flush
+_LOG_BUFFER_SIZE = 64 * 1024
+
+# Maximum number of queued entries written in one batch
+_LOG_BATCH_SIZE = 128
+
+# Seconds after which pending log output is flushed even if the buffer isn't full
+_LOG_FLUSH_INTERVAL = 0.5
+
+# Format of the timestamp prefixed to every log line
+_TS_FMT = "%Y-%m-%d %H:%M:%S"
+
+# Log levels accepted by the "log_level" configuration key
+_LOG_LEVELS = {"off": 0, "info": 1, "debug": 2}
+
+# OpenRouter's OpenAI-compatible API endpoint
+_OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+# Connection pool settings for the HTTP client shared by all LLM calls of an agent
+_HTTP_MAX_KEEPALIVE = 8
+_HTTP_KEEPALIVE_EXPIRY = 60.0
+_HTTP_TIMEOUT = 60.0
+_HTTP_CONNECT_TIMEOUT = 5.0
+
+# Fields shared by every error response returned in place of an LLM response;
+# copied with the message added, never mutated. Input is required after an error
+_LLM_ERROR_TEMPLATE = {"action": "error", "next_state": "error", "require_input": True}
+
+# Marker put on the log queue to tell the writer thread to finish
+_LOG_SENTINEL = None
+
+# Banner lines framing dev mode output blocks, and the separator between entries
+_DEV_BANNER_OPEN = "\n" + "=" * 80
+_DEV_BANNER_CLOSE = "=" * 80 + "\n"
+_DEV_SEPARATOR = "-" * 40
+
+
+@functools.lru_cache(maxsize=64)
+def _sep(title_len: int) -> str:
+    """
+    Return the separator closing a log block whose title is title_len characters long.
+    
+    Args:
+        title_len: Length of the block title
+        
+    Returns:
+        A line of "=" as wide as the "===== title =====" header
+    """
+    return "=" * (title_len + 12)  # 12 is the length of "===== " and " ====="
+
+
+class StateEntry(NamedTuple):
+    """
+    Pre-resolved configuration of a single state, built once when the config is loaded.
+    
+    Attributes:
+        prompt: Instructions for the LLM in this state
+        temperature: Temperature setting for LLM response randomness
+        model: Model identifier to use for the API call
+        transitions: States that can be transitioned to (empty means any state)
+        batch_prompts: Extra candidate prompts sent together with prompt
+    """
+    prompt: str
+    temperature: float
+    model: str
+    transitions: FrozenSet[str]
+    batch_prompts: Tuple[str, ...]
+
+
+class LLMResponse(NamedTuple):
+    """
+    A parsed LLM response.
+    
+    Attributes:
+        action: Name of the action to execute (empty for none)
+        message: Message shown to the user
+        next_state: State to transition to
+        require_input: Whether user input is read before the next LLM call
+        action_params: Parameters passed to the action function
+        confidence: Self-reported confidence, used to pick among batched responses
+    """
+    action: str = ""
+    message: str = ""
+    next_state: str = ""
+    require_input: bool = True
+    action_params: Dict = {}
+    confidence: float = 0.0
+
+
+def _decode_response(response_text: str) -> LLMResponse:
+    """
+    Parse an LLM response, normalizing missing or unexpected field values.
+    
+    Missing or null fields get their defaults, require_input also accepts
+    "1"/"true" strings, and a confidence that isn't a number counts as 0.
+    
+    Args:
+        response_text: The raw JSON text returned by the LLM
+        
+    Returns:
+        The parsed LLMResponse
+        
+    Raises:
+        ValueError: If the response is not valid JSON or not a JSON object
+    """
+    data = _json_loads(response_text)
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a JSON object, got {type(data).__name__}")
+    
+    require_input = data.get("require_input", True)
+    if isinstance(require_input, str):
+        require_input = require_input.strip().lower() in ("1", "true")
+    try:
+        confidence = float(data.get("confidence", 0))
+    except (TypeError, ValueError):
+        confidence = 0.0
+    action_params = data.get("action_params")
+    
+    return LLMResponse(
+        action=data.get("action") or "",
+        message=data.get("message") or "",
+        next_state=data.get("next_state") or "",
+        require_input=bool(require_input),
+        action_params=action_params if isinstance(action_params, dict) else {},
+        confidence=confidence,
+    )
 
-from openai import OpenAI
 
 class AIAgent:
     """
@@ -35,6 +172,9 @@ class AIAgent:
     extending functionality.
     """
     
+    # TOML parser module, imported on first use by _load_config and shared by all instances
+    _tomllib = None
+    
     def __init__(self, config_path: str, api_key: str = None, dev_mode: bool = False):
         """
         Initialize the AI agent with a configuration file.
@@ -52,21 +192,74 @@ class AIAgent:
         # Initialize dev mode flag
         self.dev_mode = dev_mode
         
-        # Initialize OpenAI client with OpenRouter configuration
-        self.client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=self.api_key
-        )
+        # Dev mode diagnostics go through a logger whose records are written to
+        # stdout by a QueueListener thread, keeping console I/O off the main loop;
+        # close() detaches the handler, so a closed agent's logger holds nothing
+        self.logger = logging.getLogger(f"agent.{id(self)}")
+        self.logger.handlers.clear()  # in case a previous agent had the same id
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG if dev_mode else logging.WARNING)
+        self._dev_q = queue.Queue()
+        self._dev_handler = None
+        self._dev_listener = None
+        if dev_mode:
+            stdout_handler = logging.StreamHandler(sys.stdout)
+            stdout_handler.setFormatter(logging.Formatter("%(message)s"))
+            self._dev_handler = logging.handlers.QueueHandler(self._dev_q)
+            self.logger.addHandler(self._dev_handler)
+            self._dev_listener = logging.handlers.QueueListener(self._dev_q, stdout_handler)
+            self._dev_listener.start()
+            atexit.register(self._close_dev_output)
+        
+        # OpenAI clients for OpenRouter, each created on first use: the sync one
+        # for _call_llm (see _get_client), the async one used by run_async
+        # (see _get_async_client)
+        self.client = None
+        self.http_client = None
+        self.async_client = None
+        self._async_http_client = None
         
         # Load configuration from TOML file
         self.config = self._load_config(config_path)
         
+        # Stream completions so the response is received incrementally and
+        # time to first token can be logged
+        self.stream = self.config.get("stream", True)
+        
+        # The general description never changes between calls, so its part of the
+        # system prompt is built once; keeping it byte-identical across calls also
+        # lets providers reuse their prompt-prefix cache
+        description = self.config.get("description", {})
+        self._static_prompt_prefix = "\n\n".join(part for part in (
+            description.get("role", ""),
+            description.get("state_machine_logic", ""),
+            description.get("work_principles", ""),
+        ) if part)
+        
+        # Resolve state definitions once so the main loop does no config lookups
+        self.states = self._build_states(self.config)
+        self._all_state_names = frozenset(self.states)
+        
         # Initialize state and history tracking
         self.current_state = self.config.get("initial_state", "start")
-        self.conversation_history = []
         
-        # Separate search history for search-related actions
-        self.search_history = []
+        # Only the most recent turns are sent to the LLM so per-call cost stays
+        # bounded; each turn is a user and an assistant message, and history_max
+        # caps the message count directly (0 = unlimited)
+        self.history_window = self.config.get("history_window", 20)
+        self.history_max = self.config.get("history_max", 2 * self.history_window)
+        
+        # Messages sent to the LLM: the system prompt, replaced before every call,
+        # followed by the conversation history
+        self._messages = collections.deque([{"role": "system", "content": ""}])
+        
+        # Separate search history for search-related actions, capped to the most
+        # recent results because all of them are embedded in every system prompt
+        self.search_window = self.config.get("search_window", 5)
+        self.search_history = collections.deque(maxlen=self.search_window or None)
+        
+        # Digests of the results currently in search_history, used to skip duplicates
+        self._seen_search_hashes = set()
         
         # Dictionary to store registered custom actions
         self.available_actions = {}
@@ -75,6 +268,29 @@ class AIAgent:
         self.log_timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H%M%S")
         self.log_file = f"agent_log_{self.log_timestamp}.txt"
         
+        # Resolve the log level once so disabled logging skips all formatting work
+        self.log_level = self.config.get("log_level", "info")
+        if self.log_level not in _LOG_LEVELS:
+            raise ValueError(f"Invalid log_level '{self.log_level}'. Expected one of: {', '.join(_LOG_LEVELS)}")
+        self._log_enabled = _LOG_LEVELS[self.log_level] >= _LOG_LEVELS["info"]
+        self._log_debug = _LOG_LEVELS[self.log_level] >= _LOG_LEVELS["debug"]
+        
+        # Last formatted log timestamp as (epoch second, text), see _timestamp
+        self._ts_cache = (None, "")
+        
+        # Log lines are queued and written by a background thread through a
+        # persistent buffered handle, so logging never blocks the main loop
+        self._log_q = queue.Queue()
+        self._log_fh = None
+        self._log_thread = None
+        if self._log_enabled:
+            # Text that can't be encoded (e.g. lone surrogates in model output) is escaped
+            self._log_fh = open(self.log_file, "a", buffering=_LOG_BUFFER_SIZE, encoding="utf-8",
+                                errors="backslashreplace")
+            self._log_thread = threading.Thread(target=self._log_worker, name="agent-log-writer", daemon=True)
+            self._log_thread.start()
+            atexit.register(self._close_log)
+        
         # Log initialization information
         self._log_info(f"Agent initialized with config from {config_path}")
         self._log_info(f"Initial state: {self.current_state}")
@@ -82,40 +298,214 @@ class AIAgent:
         
         # Print additional info in dev mode
         if self.dev_mode:
-            print(f"[DEV] Agent initialized in dev mode with config from {config_path}")
-            print(f"[DEV] Initial state: {self.current_state}")
-            print(f"[DEV] Logging to file: {self.log_file}")
+            self.logger.debug(f"[DEV] Agent initialized in dev mode with config from {config_path}")
+            self.logger.debug(f"[DEV] Initial state: {self.current_state}")
+            self.logger.debug(f"[DEV] Logging to file: {self.log_file} (level: {self.log_level})")
+    
+    @staticmethod
+    def _http_client_options() -> Dict:
+        """
+        Build the keyword arguments shared by the sync and async httpx clients.
+        
+        HTTP/2 is enabled when the optional 'h2' package is installed.
+        
+        Returns:
+            Dict of httpx client options
+        """
+        import httpx
+        return {
+            "http2": importlib.util.find_spec("h2") is not None,
+            "limits": httpx.Limits(max_keepalive_connections=_HTTP_MAX_KEEPALIVE, keepalive_expiry=_HTTP_KEEPALIVE_EXPIRY),
+            "timeout": httpx.Timeout(_HTTP_TIMEOUT, connect=_HTTP_CONNECT_TIMEOUT),
+        }
+    
+    def _log_worker(self):
+        """
+        Background thread that drains the log queue into the log file.
+        
+        Queued entries are written in batches with a single writelines call.
+        The file is flushed once enough bytes have accumulated, when the queue
+        has been idle for a while, or when flush() asks for it, and closed
+        when the sentinel is received.
+        
+        If writing fails (e.g. because the disk is full), file logging is
+        disabled and the remaining entries are dropped; the thread keeps
+        running so that flush() calls still return.
+        """
+        pending_bytes = 0
+        last_flush = time.monotonic()
+        running = True
+        while running:
+            try:
+                batch = [self._log_q.get(timeout=_LOG_FLUSH_INTERVAL)]
+            except queue.Empty:
+                batch = []
+            try:
+                while len(batch) < _LOG_BATCH_SIZE:
+                    batch.append(self._log_q.get_nowait())
+            except queue.Empty:
+                pass
+            
+            # flush() requests arrive as events to be set once the data is on disk
+            lines = [item for item in batch if isinstance(item, str)]
+            waiters = [item for item in batch if isinstance(item, threading.Event)]
+            running = _LOG_SENTINEL not in batch
+            
+            try:
+                if lines and self._log_enabled:
+                    self._log_fh.writelines(lines)
+                    pending_bytes += sum(map(len, lines))
+                
+                now = time.monotonic()
+                if self._log_enabled and (waiters or not running or (pending_bytes and (
+                        not batch or pending_bytes >= _LOG_BUFFER_SIZE or now - last_flush >= _LOG_FLUSH_INTERVAL))):
+                    self._log_fh.flush()
+                    pending_bytes = 0
+                    last_flush = now
+            except (OSError, ValueError) as e:
+                self._log_enabled = self._log_debug = False
+                print(f"Error writing to log file {self.log_file}, file logging disabled: {e}", file=sys.stderr)
+            finally:
+                for waiter in waiters:
+                    waiter.set()
+    
+    def flush(self):
+        """
+        Block until every log entry queued so far has been written to the log file.
+        
+        Called before waiting for user input so the log reflects the latest turn.
+        Returns right away if the writer thread is no longer running.
+        """
+        if self._log_fh is None or self._log_fh.closed:
+            return
+        done = threading.Event()
+        self._log_q.put(done)
+        while not done.wait(_LOG_FLUSH_INTERVAL):
+            if not self._log_thread.is_alive():
+                return
+    
+    def _close_log(self):
+        """
+        Drain any pending log lines, stop the writer thread and close the log file.
+        
+        Safe to call more than once; registered with atexit on initialization.
+        """
+        if self._log_fh is None or self._log_fh.closed:
+            return
+        self._log_q.put(_LOG_SENTINEL)
+        self._log_thread.join()
+        try:
+            self._log_fh.close()
+        except OSError:
+            pass  # The buffered entries couldn't be written; nothing left to do
+    
+    def _flush_dev_output(self):
+        """
+        Block until all queued dev mode output has been written to stdout.
+        """
+        if self._dev_listener is not None:
+            self._dev_q.join()
+    
+    def _close_dev_output(self):
+        """
+        Write out pending dev mode output, stop its listener thread and detach its handler.
+        
+        Safe to call more than once; registered with atexit in dev mode.
+        """
+        if self._dev_listener is not None:
+            self._dev_listener.stop()
+            self._dev_listener = None
+        if self._dev_handler is not None:
+            self.logger.removeHandler(self._dev_handler)
+            self._dev_handler = None
+    
+    def _print_user(self, text: str):
+        """
+        Print a user-facing line after any dev output queued before it.
+        
+        Args:
+            text: The text to display
+        """
+        self._flush_dev_output()
+        print(text)
+    
+    def close(self):
+        """
+        Release the agent's resources.
+        
+        Closes the pooled HTTP connections used for sync LLM calls, writes out any
+        pending log entries before closing the log file, and stops the dev
+        mode output thread. The exit handlers registered for the log file and
+        dev output are removed, so they no longer keep the agent alive.
+        """
+        if self.client is not None:
+            self.http_client.close()
+            self.client = None
+            self.http_client = None
+        self._close_log()
+        self._close_dev_output()
+        atexit.unregister(self._close_log)
+        atexit.unregister(self._close_dev_output)
+    
+    def _timestamp(self) -> str:
+        """
+        Return the current time formatted for a log line.
+        
+        The formatted text only changes once per second, so it is cached and
+        strftime runs at most once per second however many lines are logged.
+        """
+        now = int(time.time())
+        second, text = self._ts_cache
+        if now != second:
+            text = time.strftime(_TS_FMT, time.localtime(now))
+            self._ts_cache = (now, text)
+        return text
     
     def _log_info(self, message: str):
         """
-        Write a simple information message to the log file.
+        Queue a simple information message for the log file.
         
         Args:
             message: The message to log
         """
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(self.log_file, "a", encoding="utf-8") as f:
-            f.write(f"[{timestamp}] {message}\n")
+        if not self._log_enabled:
+            return
+        timestamp = self._timestamp()
+        self._log_q.put(f"[{timestamp}] {message}\n")
+    
+    def _log(self, message: str, *args: Any):
+        """
+        Log a %-style message, formatting it only when logging is enabled.
+        
+        Use this instead of an f-string when the arguments may be large.
+        
+        Args:
+            message: The message, optionally containing %-style placeholders
+            *args: Values substituted into the placeholders
+        """
+        if not self._log_enabled:
+            return
+        self._log_info(message % args if args else message)
     
     def _log_json(self, title: str, data: Any):
         """
-        Format and write JSON data to the log file with a title.
+        Format JSON data with a title and queue it for the log file as one entry.
         
         Args:
             title: Title describing the JSON data
             data: The data to log (will be JSON serialized if possible)
         """
-        self._log_info(f"===== {title} =====")
+        if not self._log_enabled:
+            return
+        timestamp = self._timestamp()
         if isinstance(data, (dict, list)):
             try:
-                formatted_json = json.dumps(data, ensure_ascii=False, indent=2)
-                with open(self.log_file, "a", encoding="utf-8") as f:
-                    f.write(f"{formatted_json}\n")
+                body = _json_dumps(data) + "\n"
             except:
-                self._log_info(f"Unable to serialize to JSON: {str(data)}")
+                body = f"[{timestamp}] Unable to serialize to JSON: {str(data)}\n"
         else:
-            self._log_info(str(data))
-        self._log_info("=" * (len(title) + 12))  # 12 is the length of "===== " and " ====="
+            body = f"[{timestamp}] {str(data)}\n"
+        self._log_q.put(f"[{timestamp}] ===== {title} =====\n{body}[{timestamp}] {_sep(len(title))}\n")
     
     def _load_config(self, config_path: str) -> Dict:
         """
@@ -127,8 +517,40 @@ class AIAgent:
         Returns:
             Dict containing the parsed configuration
         """
+        # Choose the appropriate TOML library based on Python version
+        if AIAgent._tomllib is None:
+            try:
+                import tomllib  # Python 3.11+
+            except ImportError:
+                import tomli as tomllib  # Python 3.10 and below, requires 'pip install tomli'
+            AIAgent._tomllib = tomllib
+        
         with open(config_path, "rb") as f:
-            return tomllib.load(f)
+            return AIAgent._tomllib.load(f)
+    
+    @staticmethod
+    def _build_states(config: Dict) -> Dict[str, StateEntry]:
+        """
+        Convert the state definitions of the configuration into StateEntry objects.
+        
+        Args:
+            config: The parsed configuration
+            
+        Returns:
+            Dict mapping state names to their StateEntry
+        """
+        states = {}
+        for name, state_config in config.get("states", {}).items():
+            if "prompt" not in state_config:
+                raise ValueError(f"State '{name}' has no prompt defined in configuration")
+            states[name] = StateEntry(
+                prompt=state_config["prompt"],
+                temperature=state_config.get("temperature", 0.7),
+                model=state_config.get("model", "llama3-70b-8192"),
+                transitions=frozenset(state_config.get("transitions", ())),
+                batch_prompts=tuple(state_config.get("batch_prompts", ())),
+            )
+        return states
     
     def register_action(self, action_name: str, action_func: Callable):
         """
@@ -138,19 +560,65 @@ class AIAgent:
         
         Args:
             action_name: Name of the action to register
-            action_func: The function to call when this action is triggered
+            action_func: The function to call when this action is triggered; may also be
+                         an async function, which is awaited instead of run in a thread
         """
         self.available_actions[action_name] = action_func
         self._log_info(f"Registered action: {action_name}")
         if self.dev_mode:
-            print(f"[DEV] Registered action: {action_name}")
+            self.logger.debug(f"[DEV] Registered action: {action_name}")
     
-    def _call_llm(self, prompt: str, temperature: float, model: str) -> Dict:
+    @property
+    def conversation_history(self) -> List[Dict[str, str]]:
+        """The conversation history, oldest message first, without the system prompt."""
+        return list(itertools.islice(self._messages, 1, None))
+    
+    def _add_message(self, role: str, content: str) -> Dict[str, str]:
         """
-        Call the LLM API and return the response as a parsed JSON.
+        Append a message to the conversation history, dropping the oldest one when
+        the history is full.
         
-        This method constructs the prompt with system context, handles API communication,
-        and processes the response.
+        Args:
+            role: Role of the message ("user", "assistant" or "system")
+            content: Text of the message
+            
+        Returns:
+            The message that was added
+        """
+        message = {"role": role, "content": content}
+        self._messages.append(message)
+        
+        # Index 0 holds the system prompt, so the oldest history message is at index 1
+        if self.history_max and len(self._messages) > self.history_max + 1:
+            del self._messages[1]
+        return message
+    
+    def _add_search_result(self, result: Any) -> bool:
+        """
+        Append a search result to the search history unless it is already there.
+        
+        Args:
+            result: The result returned by the search action
+            
+        Returns:
+            True if the result was added, False if it was a duplicate
+        """
+        digest = hashlib.blake2b(str(result).encode("utf-8"), digest_size=16).digest()
+        if digest in self._seen_search_hashes:
+            return False
+        
+        # Forget the digest of the result the bounded deque is about to evict
+        if self.search_history.maxlen is not None and len(self.search_history) == self.search_history.maxlen:
+            evicted = self.search_history[0]
+            self._seen_search_hashes.discard(hashlib.blake2b(str(evicted).encode("utf-8"), digest_size=16).digest())
+        
+        self.search_history.append(result)
+        self._seen_search_hashes.add(digest)
+        return True
+    
+    def _prepare_llm_call(self, prompt: str, temperature: float, model: str) -> list:
+        """
+        Build the message list for an LLM call and emit the log and dev output for it.
         
         Args:
             prompt: The specific prompt for the current state
@@ -158,274 +626,490 @@ class AIAgent:
             model: Model identifier to use for the API call
             
         Returns:
-            Dict containing the parsed JSON response from the LLM
+            List of messages (system prompt followed by conversation history)
         """
-        try:
-            # Get the general description from the config
-            description = self.config.get("description", {})
-            role = description.get("role", "")
-            state_machine_logic = description.get("state_machine_logic", "")
-            work_principles = description.get("work_principles", "")
+        # Format search history entries once; the same text is reused below
+        # for the log and dev output
+        search_history_text = "\n\n".join(
+            f"Search #{idx+1}: {search_result}" for idx, search_result in enumerate(self.search_history)
+        )
+        
+        # Construct a complete system prompt that includes the general description and search history
+        parts = [self._static_prompt_prefix, f"CURRENT STATE: {self.current_state}"]
+        if search_history_text:
+            parts.append("SEARCH HISTORY:\n" + search_history_text)
+        parts.append(prompt)
+        complete_system_prompt = "\n\n".join(part for part in parts if part)
+        
+        # Replace the leading system message and snapshot the messages. The old
+        # system message is not mutated because a concurrent call may still be
+        # sending it
+        self._messages[0] = {"role": "system", "content": complete_system_prompt}
+        messages = list(self._messages)
+        
+        # Log LLM call details
+        self._log_info(f"CALLING LLM - Model: {model}, Temperature: {temperature}")
+        self._log_info(f"Current state: {self.current_state}")
+        self._log_json("System prompt", messages[0])
+        
+        if search_history_text:
+            self._log("SEARCH HISTORY:\n%s", search_history_text)
+        
+        # Walking every message is O(history size), so do it in a single pass and
+        # only when the messages are logged at debug level or shown in dev mode
+        if self._log_debug or self.dev_mode:
+            lines = [_DEV_BANNER_OPEN]
+            if search_history_text:
+                lines += ["[DEV] SEARCH HISTORY:", search_history_text, _DEV_SEPARATOR]
             
-            # Format search history as a separate block if it exists
-            search_history_block = ""
-            if self.search_history:
-                search_history_block = "\n\nSEARCH HISTORY:\n"
-                for idx, search_result in enumerate(self.search_history):
-                    search_history_block += f"Search #{idx+1}: {search_result}\n\n"
-                print("[DEV] SEARCH HISTORY:")
-                for i, search_result in enumerate(self.search_history):
-                    print(f"[DEV] Search Result #{i+1}:")
-                    print(search_result)
-                    print("-"*40) 
+            lines += ["[DEV] CALLING LLM", f"[DEV] Model: {model}", f"[DEV] Temperature: {temperature}", "[DEV] Prompt and Messages:"]
+            for i, msg in enumerate(messages):
+                if i > 0 and self._log_debug:  # Skip system prompt as it's already logged separately
+                    self._log_json(f"Message {i} ({msg['role']})", msg)
+                if self.dev_mode:
+                    lines += [f"[DEV] Message {i} ({msg['role']}):", f"{msg['content']}", _DEV_SEPARATOR]  # Separator between messages for better readability
             
-            # Construct a complete system prompt that includes the general description and search history
-            complete_system_prompt = f"""
-            {role}
-
-            {state_machine_logic}
-
-            {work_principles}
-
-            CURRENT STATE: {self.current_state}
-            {search_history_block}
-            {prompt}
-            """
+            # Output debug information if in dev mode, as a single record
+            if self.dev_mode:
+                lines.append(_DEV_BANNER_CLOSE)
+                self.logger.debug("\n".join(lines))
+        
+        return messages
+    
+    def _parse_llm_response(self, response_text: str) -> LLMResponse:
+        """
+        Log the raw LLM response and parse it as JSON.
+        
+        Args:
+            response_text: The raw text content returned by the LLM
             
-            # Format the system prompt and user conversation history
-            messages = [{"role": "system", "content": complete_system_prompt}]
+        Returns:
+            LLMResponse decoded from the JSON response, or an error response if parsing fails
+        """
+        # Log the raw LLM response
+        self._log_json("LLM RAW RESPONSE", response_text)
+        
+        if self.dev_mode:
+            self.logger.debug("\n".join([_DEV_BANNER_OPEN, "[DEV] LLM RAW RESPONSE:", response_text, _DEV_BANNER_CLOSE]))
+        
+        # Parse JSON response, handle errors gracefully
+        try:
+            return _decode_response(response_text)
+        except ValueError as e:
+            error_msg = f"Error: LLM response is not valid JSON: {response_text} ({e})"
+            self._log_info(error_msg)
+            if self.dev_mode:
+                self.logger.debug(f"[DEV] {error_msg}")
+            return LLMResponse(**_LLM_ERROR_TEMPLATE, message="I apologize, but I encountered an error processing your request.")
+    
+    def _add_stream_chunk(self, chunk: Any, parts: List[str], started: float):
+        """
+        Collect the text of one streamed completion chunk.
+        
+        Args:
+            chunk: A chunk received from a streaming chat completion
+            parts: Text received so far; the chunk's text is appended to it
+            started: time.monotonic() value taken when the request was sent
+        """
+        if not chunk.choices:
+            return
+        delta = chunk.choices[0].delta.content
+        if delta:
+            if not parts:
+                self._log("First token received after %.0f ms", (time.monotonic() - started) * 1000)
+            parts.append(delta)
+    
+    def _llm_error_response(self, e: Exception) -> LLMResponse:
+        """
+        Log an exception raised during an LLM call and build the matching error response.
+        
+        Args:
+            e: The exception raised while calling the LLM API
             
-            # Add conversation history
-            for msg in self.conversation_history:
-                messages.append(msg)
+        Returns:
+            LLMResponse containing an error response that moves the agent to the error state
+        """
+        error_msg = f"Error calling LLM API: {e}"
+        self._log_info(error_msg)
+        if self.dev_mode:
+            self.logger.debug(f"[DEV] {error_msg}")
+        return LLMResponse(**_LLM_ERROR_TEMPLATE, message=f"Error occurred: {str(e)}")
+    
+    def _call_llm(self, prompt: Union[str, List[str]], temperature: float, model: str) -> Union[LLMResponse, List[LLMResponse]]:
+        """
+        Call the LLM API and return the parsed response.
+        
+        This method constructs the prompt with system context, handles API communication,
+        and processes the response.
+        
+        Args:
+            prompt: The specific prompt for the current state, or a list of candidate prompts
+            temperature: Temperature setting for LLM response randomness
+            model: Model identifier to use for the API call
             
-            # Log LLM call details
-            self._log_info(f"CALLING LLM - Model: {model}, Temperature: {temperature}")
-            self._log_info(f"Current state: {self.current_state}")
-            self._log_json("System prompt", {"role": "system", "content": complete_system_prompt})
+        Returns:
+            LLMResponse parsed from the JSON response of the LLM, or a list of them
+            (one per prompt, in order) when a list of prompts was given
+        """
+        if isinstance(prompt, list):
+            return [self._call_llm(p, temperature, model) for p in prompt]
+        
+        try:
+            messages = self._prepare_llm_call(prompt, temperature, model)
+            started = time.monotonic()
             
-            for i, msg in enumerate(messages):
-                if i > 0:  # Skip system prompt as it's already logged separately
-                    self._log_json(f"Message {i} ({msg['role']})", msg)
+            # Make the actual API call
+            completion = self._get_client().chat.completions.create(
+                model=model,
+                temperature=temperature,
+                messages=messages,
+                max_tokens=5000,
+                response_format={"type": "json_object"},
+                stream=self.stream
+            )
             
-            if self.search_history:
-                for i, search_result in enumerate(self.search_history):
-                    self._log_info(f"Search Result #{i+1}:")
-                    self._log_info(search_result)
-
-          
-            # Output debug information if in dev mode
-            if self.dev_mode:
-                print("\n" + "="*80)
-                if self.search_history:
-                    print("[DEV] SEARCH HISTORY:")
-                    for i, search_result in enumerate(self.search_history):
-                        print(f"[DEV] Search Result #{i+1}:")
-                        print(search_result)
-                        print("-"*40)  
-
-                print("[DEV] CALLING LLM")
-                print(f"[DEV] Model: {model}")
-                print(f"[DEV] Temperature: {temperature}")
-                print("[DEV] Prompt and Messages:")
-                for i, msg in enumerate(messages):
-                    print(f"[DEV] Message {i} ({msg['role']}):")
-                    print(f"{msg['content']}")
-                    print("-"*40)  # Separator between messages for better readability
-                
-                print("="*80 + "\n")
+            if self.stream:
+                parts = []
+                for chunk in completion:
+                    self._add_stream_chunk(chunk, parts, started)
+                response_text = "".join(parts)
+            else:
+                response_text = completion.choices[0].message.content
+            
+            return self._parse_llm_response(response_text)
+        except Exception as e:
+            # Handle any other exceptions during API call
+            return self._llm_error_response(e)
+    
+    async def _call_llm_async(self, prompt: Union[str, List[str]], temperature: float, model: str) -> Union[LLMResponse, List[LLMResponse]]:
+        """
+        Asynchronous version of _call_llm using the AsyncOpenAI client.
+        
+        The event loop stays free while waiting for the LLM, so other tasks
+        can run in the meantime. A list of prompts is sent as concurrent
+        requests, so the batch costs one round trip instead of one per prompt.
+        
+        Args:
+            prompt: The specific prompt for the current state, or a list of candidate prompts
+            temperature: Temperature setting for LLM response randomness
+            model: Model identifier to use for the API call
+            
+        Returns:
+            LLMResponse parsed from the JSON response of the LLM, or a list of them
+            (one per prompt, in order) when a list of prompts was given
+        """
+        if isinstance(prompt, list):
+            return list(await asyncio.gather(*(self._call_llm_async(p, temperature, model) for p in prompt)))
+        
+        try:
+            messages = self._prepare_llm_call(prompt, temperature, model)
+            started = time.monotonic()
             
             # Make the actual API call
-            completion = self.client.chat.completions.create(
+            completion = await self._get_async_client().chat.completions.create(
                 model=model,
                 temperature=temperature,
                 messages=messages,
                 max_tokens=5000,
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                stream=self.stream
             )
             
-            response_text = completion.choices[0].message.content
+            if self.stream:
+                parts = []
+                async for chunk in completion:
+                    self._add_stream_chunk(chunk, parts, started)
+                response_text = "".join(parts)
+            else:
+                response_text = completion.choices[0].message.content
             
-            # Log the raw LLM response
-            self._log_json("LLM RAW RESPONSE", response_text)
+            return self._parse_llm_response(response_text)
+        except Exception as e:
+            # Handle any other exceptions during API call
+            return self._llm_error_response(e)
+    
+    def _select_response(self, responses: List[LLMResponse], allowed_transitions: FrozenSet[str]) -> LLMResponse:
+        """
+        Pick the best response out of a batch of candidate LLM responses.
+        
+        Responses whose next_state is a valid transition win over invalid ones;
+        among those, the one reporting the highest "confidence" is chosen, and
+        ties go to the earliest prompt.
+        
+        Args:
+            responses: Parsed LLM responses, in prompt order
+            allowed_transitions: Transitions allowed from the current state
             
-            if self.dev_mode:
-                print("\n" + "="*80)
-                print("[DEV] LLM RAW RESPONSE:")
-                print(response_text)
-                print("="*80 + "\n")
+        Returns:
+            The selected response
+        """
+        def score(response):
+            next_state = response.next_state
+            valid = next_state in self._all_state_names and (not allowed_transitions or next_state in allowed_transitions)
+            return (valid, response.confidence)
+        
+        return max(responses, key=score)
+    
+    def _get_client(self):
+        """
+        Return the OpenAI client, creating it on first use.
+        
+        The client keeps a keep-alive connection pool, so consecutive LLM calls
+        reuse a warm TLS connection; it is released by close().
+        """
+        if self.client is None:
+            # Imported here so importing this module stays cheap
+            from openai import OpenAI
+            import httpx
+            self.http_client = httpx.Client(**self._http_client_options())
+            self.client = OpenAI(
+                base_url=_OPENROUTER_BASE_URL,
+                api_key=self.api_key,
+                http_client=self.http_client
+            )
+        return self.client
+    
+    def _get_async_client(self):
+        """
+        Return the AsyncOpenAI client, creating it on first use.
+        
+        The async client owns its own connection pool, which is bound to the
+        running event loop and released by _close_async_client.
+        """
+        if self.async_client is None:
+            from openai import AsyncOpenAI
+            import httpx
+            self._async_http_client = httpx.AsyncClient(**self._http_client_options())
+            self.async_client = AsyncOpenAI(
+                base_url=_OPENROUTER_BASE_URL,
+                api_key=self.api_key,
+                http_client=self._async_http_client
+            )
+        return self.async_client
+    
+    async def _close_async_client(self):
+        """
+        Close the AsyncOpenAI client and its connection pool if they were created.
+        """
+        if self.async_client is not None:
+            await self._async_http_client.aclose()
+            self.async_client = None
+            self._async_http_client = None
+    
+    async def _read_user_input(self, prompt_text: str) -> str:
+        """
+        Wait for a line of user input without blocking the event loop.
+        
+        The log and dev output are flushed first so they reflect the finished
+        turn during the wait. Both happen on a daemon thread, which unlike an executor thread
+        doesn't keep the process alive if the agent is interrupted meanwhile.
+        
+        Args:
+            prompt_text: The prompt shown to the user
             
-            # Parse JSON response, handle errors gracefully
+        Returns:
+            The line entered by the user
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        
+        def deliver(setter, value):
+            if not future.done():
+                setter(value)
+        
+        def reader():
             try:
-                return json.loads(response_text)
-            except json.JSONDecodeError:
-                error_msg = f"Error: LLM response is not valid JSON: {response_text}"
-                self._log_info(error_msg)
-                if self.dev_mode:
-                    print(f"[DEV] {error_msg}")
-                return {
-                    "action": "error",
-                    "message": "I apologize, but I encountered an error processing your request.",
-                    "next_state": "error",
-                    "require_input": "1"  # Default to requiring input after an error
-                }
-        except Exception as e:
-            # Handle any other exceptions during API call
-            error_msg = f"Error calling LLM API: {e}"
-            self._log_info(error_msg)
-            if self.dev_mode:
-                print(f"[DEV] {error_msg}")
-            return {
-                "action": "error",
-                "message": f"Error occurred: {str(e)}",
-                "next_state": "error",
-                "require_input": "1"  # Default to requiring input after an error
-            }
+                self.flush()
+                self._flush_dev_output()
+                result = input(prompt_text)
+            except BaseException as e:
+                loop.call_soon_threadsafe(deliver, future.set_exception, e)
+            else:
+                loop.call_soon_threadsafe(deliver, future.set_result, result)
+        
+        threading.Thread(target=reader, name="agent-input", daemon=True).start()
+        return await future
+    
+    async def _execute_action(self, action: str, action_params: Dict) -> Any:
+        """
+        Execute a registered action without blocking the event loop.
+        
+        Coroutine functions are awaited directly; regular functions run in the
+        default thread pool executor.
+        
+        Args:
+            action: Name of the registered action
+            action_params: Parameters passed to the action function
+            
+        Returns:
+            The value returned by the action function
+        """
+        action_func = self.available_actions[action]
+        if asyncio.iscoroutinefunction(action_func):
+            return await action_func(action_params)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, action_func, action_params)
     
     def run(self, user_input: str = None):
         """
         Run the agent's main loop, processing user input and transitioning between states.
         
         This is the main method to start the agent's execution. It will continue running
-        until it reaches a terminal state or encounters an error.
+        until it reaches a terminal state or encounters an error. It is a synchronous
+        wrapper around run_async; from code that already runs an event loop, await
+        run_async instead.
         
         Args:
             user_input: Initial user input to start the conversation (optional)
         """
-        # Process initial user input if provided
-        if user_input:
-            self.conversation_history.append({"role": "user", "content": user_input})
-            self._log_json("Initial user input", {"role": "user", "content": user_input})
-            if self.dev_mode:
-                print(f"[DEV] Initial user input: {user_input}")
+        asyncio.run(self.run_async(user_input))
+    
+    async def run_async(self, user_input: str = None):
+        """
+        Asynchronous version of run.
         
-        # Main execution loop counter
-        loop_count = 0
+        LLM calls are awaited on the AsyncOpenAI client and registered actions run
+        without blocking the event loop, so other tasks can progress meanwhile.
         
-        # Main agent execution loop
-        while True:
-            loop_count += 1
-            self._log_info(f"===== LOOP #{loop_count} =====")
-            
-            # Get current state configuration from the config file
-            state_config = self.config["states"].get(self.current_state)
-            if not state_config:
-                error_msg = f"Error: State '{self.current_state}' not found in configuration"
-                self._log_info(error_msg)
+        Args:
+            user_input: Initial user input to start the conversation (optional)
+        """
+        try:
+            # Process initial user input if provided
+            if user_input:
+                self._log_json("Initial user input", self._add_message("user", user_input))
                 if self.dev_mode:
-                    print(f"[DEV] {error_msg}")
-                print(error_msg)
-                break
+                    self.logger.debug(f"[DEV] Initial user input: {user_input}")
             
-            # Log current state information
-            self._log_info(f"Current state: {self.current_state}")
-            self._log_info(f"Allowed transitions: {state_config.get('transitions', [])}")
-            
-            if self.dev_mode:
-                print(f"[DEV] Current state: {self.current_state}")
-                print(f"[DEV] Allowed transitions: {state_config.get('transitions', [])}")
+            # Main execution loop counter
+            loop_count = 0
             
-            # Extract configuration for the current state
-            prompt = state_config["prompt"]
-            temperature = state_config.get("temperature", 0.7)
-            model = state_config.get("model", "llama3-70b-8192")
-            
-            # Call LLM with the configured prompt and settings
-            response = self._call_llm(prompt, temperature, model)
-            
-            # Extract response components for processing
-            action = response.get("action", "")
-            message = response.get("message", "")
-            next_state = response.get("next_state", "")
-            require_input = response.get("require_input", "1")  # Default to requiring input if not specified
-            
-            # Log LLM decision information
-            self._log_info(f"LLM decided action: {action}")
-            self._log_info(f"LLM next state: {next_state}")
-            self._log_info(f"LLM require_input: {require_input}")
-            
-            if self.dev_mode:
-                print(f"[DEV] LLM decided action: {action}")
-                print(f"[DEV] LLM next state: {next_state}")
-                print(f"[DEV] LLM require_input: {require_input}")
-            
-            # Add assistant's message to conversation history
-            self.conversation_history.append({"role": "assistant", "content": message})
-            
-            # Log assistant's reply
-            self._log_json("Assistant reply", {"role": "assistant", "content": message})
-            
-            # Display the message to the user
-            print(f"Agent: {message}")            
+            # Main agent execution loop
+            while True:
+                loop_count += 1
+                self._log_info(f"===== LOOP #{loop_count} =====")
+                
+                # Get current state configuration
+                state = self.states.get(self.current_state)
+                if state is None:
+                    error_msg = f"Error: State '{self.current_state}' not found in configuration"
+                    self._log_info(error_msg)
+                    if self.dev_mode:
+                        self.logger.debug(f"[DEV] {error_msg}")
+                    self._print_user(error_msg)
+                    break
+                
+                # Log current state information
+                self._log_info(f"Current state: {self.current_state}")
+                self._log("Allowed transitions: %s", sorted(state.transitions))
                 
-            # Execute registered action if specified in the response
-            if action and action in self.available_actions:
-                # Extract any action parameters from the response
-                action_params = response.get("action_params", {})
-                self._log_json(f"Executing action: {action}", action_params)
                 if self.dev_mode:
-                    print(f"[DEV] Executing action: {action}")
-                    print(f"[DEV] Action parameters: {action_params}")
+                    self.logger.debug(f"[DEV] Current state: {self.current_state}")
+                    self.logger.debug(f"[DEV] Allowed transitions: {sorted(state.transitions)}")
                 
-                # Call the registered action function with parameters
-                action_result = self.available_actions[action](action_params)
-                self._log_info(f"Action result: {action_result}")
+                # Extract configuration for the current state
+                prompt, temperature, model = state.prompt, state.temperature, state.model
                 
-                # Handle different types of action results
-                if action_result:
-                    if action == "search":
-                        # Add search results to separate search history
-                        self.search_history.append(action_result)
-                        self._log_info(f"Search result added to search history")
-                        if self.dev_mode:
-                            print(f"[DEV] Search result added to search history")
-                    else:
-                        # For other actions, add result to conversation history
-                        self.conversation_history.append({
-                            "role": "system", 
-                            "content": f"Action result: {action_result}"
-                        })
-                        self._log_json("Action result added to conversation", {
-                            "role": "system", 
-                            "content": f"Action result: {action_result}"
-                        })
-                    
+                # Call LLM with the configured prompt and settings; states declaring
+                # batch_prompts send all candidate prompts at once and keep the best answer
+                if state.batch_prompts:
+                    responses = await self._call_llm_async([prompt, *state.batch_prompts], temperature, model)
+                    response = self._select_response(responses, state.transitions)
+                    self._log_info(f"Selected response {responses.index(response) + 1} of {len(responses)} batched prompts")
                     if self.dev_mode:
-                        print(f"[DEV] Action result: {action_result}")
-            
-            # Validate and process state transition
-            allowed_transitions = state_config.get("transitions", [])
-            if next_state in self.config["states"] and (not allowed_transitions or next_state in allowed_transitions):
-                self._log_info(f"Transitioning from '{self.current_state}' to '{next_state}'")
-                if self.dev_mode:
-                    print(f"[DEV] Transitioning from '{self.current_state}' to '{next_state}'")
-                self.current_state = next_state
-            else:
-                # Handle invalid state transition
-                error_msg = f"Error: Invalid transition from '{self.current_state}' to '{next_state}'"
-                self._log_info(error_msg)
-                if self.dev_mode:
-                    print(f"[DEV] {error_msg}")
-                print(error_msg)
-                self.current_state = "error"
-            
-            # Check if this is a terminal state to exit the loop
-            if next_state == "exit" or next_state == "":
-                self._log_info("Reached terminal state, exiting.")
+                        self.logger.debug(f"[DEV] Selected response {responses.index(response) + 1} of {len(responses)} batched prompts")
+                else:
+                    response = await self._call_llm_async(prompt, temperature, model)
+                
+                # Extract response components for processing
+                action = response.action
+                message = response.message
+                next_state = response.next_state
+                require_input = response.require_input  # Defaults to requiring input if not specified
+                
+                # Log LLM decision information
+                self._log_info(f"LLM decided action: {action}")
+                self._log_info(f"LLM next state: {next_state}")
+                self._log_info(f"LLM require_input: {require_input}")
+                
                 if self.dev_mode:
-                    print("[DEV] Reached terminal state, exiting.")
-                break            
+                    self.logger.debug(f"[DEV] LLM decided action: {action}")
+                    self.logger.debug(f"[DEV] LLM next state: {next_state}")
+                    self.logger.debug(f"[DEV] LLM require_input: {require_input}")
+                
+                # Add assistant's message to conversation history and log it
+                self._log_json("Assistant reply", self._add_message("assistant", message))
+                
+                # Display the message to the user
+                self._print_user(f"Agent: {message}")
+                    
+                # Execute registered action if specified in the response
+                if action and action in self.available_actions:
+                    # Extract any action parameters from the response
+                    action_params = response.action_params
+                    self._log_json(f"Executing action: {action}", action_params)
+                    if self.dev_mode:
+                        self.logger.debug(f"[DEV] Executing action: {action}")
+                        self.logger.debug(f"[DEV] Action parameters: {action_params}")
+                    
+                    # Call the registered action function with parameters
+                    action_result = await self._execute_action(action, action_params)
+                    self._log("Action result: %s", action_result)
+                    
+                    # Handle different types of action results
+                    if action_result:
+                        if action == "search":
+                            # Add search results to separate search history, skipping repeats
+                            if self._add_search_result(action_result):
+                                self._log_info("Search result added to search history")
+                                if self.dev_mode:
+                                    self.logger.debug("[DEV] Search result added to search history")
+                            else:
+                                self._log_info("Duplicate search result skipped")
+                                if self.dev_mode:
+                                    self.logger.debug("[DEV] Duplicate search result skipped")
+                        else:
+                            # For other actions, add result to conversation history
+                            self._log_json("Action result added to conversation",
+                                           self._add_message("system", f"Action result: {action_result}"))
+                        
+                        if self.dev_mode:
+                            self.logger.debug(f"[DEV] Action result: {action_result}")
+                
+                # Validate and process state transition
+                if next_state in self._all_state_names and (not state.transitions or next_state in state.transitions):
+                    self._log_info(f"Transitioning from '{self.current_state}' to '{next_state}'")
+                    if self.dev_mode:
+                        self.logger.debug(f"[DEV] Transitioning from '{self.current_state}' to '{next_state}'")
+                    self.current_state = next_state
+                else:
+                    # Handle invalid state transition
+                    error_msg = f"Error: Invalid transition from '{self.current_state}' to '{next_state}'"
+                    self._log_info(error_msg)
+                    if self.dev_mode:
+                        self.logger.debug(f"[DEV] {error_msg}")
+                    self._print_user(error_msg)
+                    self.current_state = "error"
+                
+                # Check if this is a terminal state to exit the loop
+                if next_state == "exit" or next_state == "":
+                    self._log_info("Reached terminal state, exiting.")
+                    if self.dev_mode:
+                        self.logger.debug("[DEV] Reached terminal state, exiting.")
+                    break            
 
-            # Handle user input requirements for the next loop iteration
-            if require_input == "1":
-                # Get user input for the next iteration
-                user_input = input("You: ")
-                self.conversation_history.append({"role": "user", "content": user_input})
-                self._log_json("User input", {"role": "user", "content": user_input})
-                if self.dev_mode:
-                    print(f"[DEV] User input: {user_input}")
-            else:
-                # Continue to next state without user input
-                self._log_info("No user input required, proceeding to next state automatically")
-                if self.dev_mode:
-                    print("[DEV] No user input required, proceeding to next state automatically")
\ No newline at end of file
+                # Handle user input requirements for the next loop iteration
+                if require_input:
+                    # Get user input for the next iteration
+                    user_input = await self._read_user_input("You: ")
+                    self._log_json("User input", self._add_message("user", user_input))
+                    if self.dev_mode:
+                        self.logger.debug(f"[DEV] User input: {user_input}")
+                else:
+                    # Continue to next state without user input
+                    self._log_info("No user input required, proceeding to next state automatically")
+                    if self.dev_mode:
+                        self.logger.debug("[DEV] No user input required, proceeding to next state automatically")
+        finally:
+            await self._close_async_client()
+            self._flush_dev_output()
@@ -15,20 +15,197 @@ Features:
 - Save and reload configurations
 """
 
-import os, sys
+import os, sys, io, copy, mmap, base64, inspect, importlib.util, threading, queue
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import numpy as np
+import matplotlib.patches as mpatches
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import networkx as nx
 
-# Choose the appropriate TOML library based on Python version
+# Prefer rtoml ('pip install rtoml'), a much faster TOML parser and writer
+# written in Rust, and otherwise use the parser matching the Python version
+# with tomli_w for writing
 try:
-    import tomllib  # Python 3.11+
-    import tomli_w as tomli_write  # For writing TOML
+    import rtoml
+    
+    _toml_loads = rtoml.loads
+    _toml_dumps = rtoml.dumps
 except ImportError:
-    import tomli as tomllib  # Python 3.10 and below
-    import tomli_w as tomli_write  # For writing TOML
+    if sys.version_info >= (3, 11):
+        import tomllib
+    else:
+        import tomli as tomllib
+    import tomli_w
+    
+    _toml_loads = tomllib.loads
+    _toml_dumps = tomli_w.dumps
+
+# Tk variable classes handed out by ConfigEditorApp._get_var
+_VAR_TYPES = {"str": tk.StringVar, "double": tk.DoubleVar, "bool": tk.BooleanVar}
+
+# Buffer size of the file handle used to save the config
+_SAVE_BUFFER_SIZE = 1 << 16
+
+# Common models offered by the model editors
+MODEL_OPTIONS = ("llama3-70b-8192", "qwen/qwen-2.5-72b-instruct", "gpt-4o", "claude-3-opus-20240229")
+
+# Prefix of the item ids of the placeholder children given to state items
+# whose field items haven't been inserted yet, see ConfigEditorApp.populate_tree
+_TREE_PLACEHOLDER_PREFIX = "placeholder::"
+
+# From this many new items on, populate_tree detaches the tree contents while
+# inserting them, so the tree is laid out once instead of after every insert
+_TREE_BATCH_MIN_ITEMS = 50
+
+# Milliseconds a status bar message stays visible
+_STATUS_CLEAR_MS = 3000
+
+# Milliseconds by which graph and tree refreshes requested by edits are deferred,
+# so that several edits in a row are applied in one refresh
+_REFRESH_DELAY_MS = 50
+
+# Milliseconds to wait after a layout selection before redrawing the graph
+_LAYOUT_CHANGE_DELAY_MS = 150
+
+# Milliseconds between checks for layouts and drawings finished on worker threads
+_LAYOUT_POLL_MS = 50
+
+# Milliseconds to wait after the graph area is resized before drawing the graph
+# at the new size
+_GRAPH_RESIZE_DELAY_MS = 200
+
+# Resolution of the graph drawing, and its size in pixels before the graph
+# area is first shown
+_GRAPH_DPI = 100
+_GRAPH_DEFAULT_SIZE = (1000, 800)
+
+# From this many states on, edges are drawn without arrowheads as a single
+# line collection and nodes as a single scatter plot
+_FAST_DRAW_MIN_NODES = 100
+
+# Drawing options for the state graph
+_INITIAL_NODE_OPTIONS = {"node_color": "lightgreen", "node_size": 700}
+_REGULAR_NODE_OPTIONS = {"node_color": "skyblue", "node_size": 500}
+_EDGE_OPTIONS = {"width": 1.0, "alpha": 0.7, "arrowsize": 20}
+_LABEL_OPTIONS = {"font_size": 10, "font_family": "sans-serif"}
+
+# Spring layout settings; fewer iterations and a looser threshold than the
+# defaults converge well enough for a state diagram at a fraction of the cost
+_SPRING_LAYOUT_OPTIONS = {"seed": 42, "iterations": 30, "threshold": 1e-3}
+
+# From this many states on, spring layouts use the sparse energy-based solver
+# (L-BFGS) of newer NetworkX releases when SciPy is installed
+_SPARSE_LAYOUT_MIN_NODES = 100
+_HAS_SPARSE_LAYOUT = (importlib.util.find_spec("scipy") is not None
+                      and "method" in inspect.signature(nx.spring_layout).parameters)
+
+def _spring_layout(G, fixed_pos=None):
+    """
+    Compute a spring layout, using the sparse solver for large graphs.
+    
+    Args:
+        G (nx.DiGraph): The graph to lay out
+        fixed_pos (dict): Positions of nodes that must stay where they are;
+            only the remaining nodes are placed
+        
+    Returns:
+        dict: Mapping of node to position
+    """
+    options = dict(_SPRING_LAYOUT_OPTIONS)
+    if fixed_pos:
+        options.update(pos=fixed_pos, fixed=list(fixed_pos))
+    if _HAS_SPARSE_LAYOUT and len(G) > _SPARSE_LAYOUT_MIN_NODES:
+        options["method"] = "energy"
+    return nx.spring_layout(G, **options)
+
+def _draw_graph(ax, G, pos, initial_state):
+    """
+    Draw the state graph onto a matplotlib axes.
+    
+    Args:
+        ax (matplotlib.axes.Axes): The axes to draw on
+        G (nx.DiGraph): The state machine graph
+        pos (dict): Mapping of state name to position
+        initial_state (str): Name of the initial state, highlighted in the drawing
+    """
+    # Split the nodes by type for coloring with a single comparison
+    nodes = np.array(list(G), dtype=object)
+    mask = nodes == initial_state
+    initial_nodes = nodes[mask].tolist()
+    regular_nodes = nodes[~mask].tolist()
+    
+    if len(nodes) >= _FAST_DRAW_MIN_NODES:
+        # Draw all edges as one line collection and all nodes as one scatter
+        # plot; NetworkX creates an artist per edge when drawing arrows
+        segments = [(pos[u], pos[v]) for u, v in G.edges()]
+        ax.add_collection(LineCollection(segments, colors='k', linewidths=_EDGE_OPTIONS["width"],
+                                         alpha=_EDGE_OPTIONS["alpha"], zorder=1))
+        xy = np.array([pos[n] for n in nodes]).reshape(-1, 2)
+        ax.scatter(xy[:, 0], xy[:, 1], zorder=2,
+                   c=np.where(mask, _INITIAL_NODE_OPTIONS["node_color"], _REGULAR_NODE_OPTIONS["node_color"]),
+                   s=np.where(mask, _INITIAL_NODE_OPTIONS["node_size"], _REGULAR_NODE_OPTIONS["node_size"]))
+    else:
+        # Draw the nodes
+        nx.draw_networkx_nodes(G, pos, nodelist=initial_nodes, ax=ax, **_INITIAL_NODE_OPTIONS)
+        nx.draw_networkx_nodes(G, pos, nodelist=regular_nodes, ax=ax, **_REGULAR_NODE_OPTIONS)
+        
+        # Draw the edges
+        nx.draw_networkx_edges(G, pos, ax=ax, **_EDGE_OPTIONS)
+    
+    # Draw the labels
+    nx.draw_networkx_labels(G, pos, ax=ax, **_LABEL_OPTIONS)
+    
+    # Remove the axis
+    ax.set_axis_off()
+    
+    # Add title
+    ax.set_title("State Machine Visualization", fontsize=16)
+    
+    # Add legend; artists can't be shared between figures, so the handles
+    # are created for every drawing
+    ax.legend(handles=[
+        mpatches.Patch(color=_INITIAL_NODE_OPTIONS["node_color"], label="Initial State"),
+        mpatches.Patch(color=_REGULAR_NODE_OPTIONS["node_color"], label="Regular State"),
+    ], loc='upper right')
+
+def _render_graph_png(G, pos, initial_state, size):
+    """
+    Draw the state graph into a PNG image.
+    
+    Uses its own figure and the Agg renderer, so it can run on a worker thread.
+    
+    Args:
+        G (nx.DiGraph): The state machine graph
+        pos (dict): Mapping of state name to position
+        initial_state (str): Name of the initial state
+        size (tuple): Width and height of the image in pixels
+        
+    Returns:
+        bytes: The PNG image data
+    """
+    fig = Figure(figsize=(size[0] / _GRAPH_DPI, size[1] / _GRAPH_DPI), dpi=_GRAPH_DPI)
+    FigureCanvasAgg(fig)
+    _draw_graph(fig.add_subplot(), G, pos, initial_state)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    return buffer.getvalue()
+
+def _tree_iid(path):
+    """
+    Return the navigation tree item id for an item's values path.
+    
+    Args:
+        path (tuple): The item's values, e.g. ("states", "greeting", "prompt")
+        
+    Returns:
+        str: The item id, e.g. "state::greeting::prompt"
+    """
+    if path[0] == "states" and len(path) > 1:
+        return "state::" + "::".join(path[1:])
+    return "::".join(path)
 
 class ConfigEditorApp:
     """
@@ -57,6 +234,78 @@ class ConfigEditorApp:
         self.config_path = config_path
         self.config_data = None
         
+        # Graph layouts already computed, keyed by layout name and graph topology,
+        # so redraws that don't change the topology skip the layout algorithm
+        self._layout_cache = {}
+        
+        # Positions of the last drawn spring layout. New spring layouts of the
+        # edited graph keep these states in place and only position new ones,
+        # so the drawing doesn't jump around on every edit
+        self._graph_pos = {}
+        
+        # What the last update_graph call drew, to skip updates that change nothing
+        self._last_graph_sig = None
+        
+        # Layouts computed on worker threads are handed back through this queue;
+        # the generation identifies the latest graph, the job count how many are pending
+        self._layout_results = queue.Queue()
+        self._layout_generation = 0
+        self._layout_jobs = 0
+        
+        # Drawings of the graph are rendered to images by a single worker thread,
+        # started on first use. Requests go through a one-entry slot holding
+        # only the latest drawing, so drawings replaced before the worker gets
+        # to them are never rendered; finished images come back through the
+        # queue. The generation identifies the latest request, _render_done the
+        # latest one finished. The latest graph and positions are kept for
+        # redrawing it when the graph area is resized
+        self._render_results = queue.Queue()
+        self._render_generation = 0
+        self._render_done = 0
+        self._render_slot = None
+        self._render_cond = threading.Condition()
+        self._render_thread = None
+        self._render_polling = False
+        self._graph_drawing = None
+        self._graph_render_size = None
+        
+        # Pending deferred refreshes, see request_graph_update and request_tree_update.
+        # The graph is only drawn while the visualization tab is visible
+        self._graph_visible = False
+        self._graph_dirty = False
+        self._graph_after_id = None
+        self._tree_dirty = False
+        self._tree_after_id = None
+        
+        # Set while update_graph or populate_tree runs; a nested call only marks
+        # the graph or tree as outdated, and it is refreshed once more afterwards
+        self._in_update_graph = False
+        self._in_populate_tree = False
+        
+        # Names of the configured states, see state_names, and the add-state
+        # template choices built from them; both are reset when states change
+        self._states_tuple_cache = None
+        self._template_options_cache = None
+        
+        # Items currently shown in the navigation tree: path -> item id, path ->
+        # (parent path, text), and parent path -> child paths, used by
+        # populate_tree to apply only the differences
+        self._tree_items = {}
+        self._tree_nodes = {}
+        self._tree_children = {}
+        # States whose field items have been inserted, after first being expanded
+        self._tree_loaded_states = set()
+        
+        # (mtime, size, parsed data) of the last parsed config file, so reloading
+        # an unchanged file skips the TOML parse
+        self._parse_cache = None
+        
+        # Create status bar for success messages; errors still use dialogs.
+        # Packed first so the notebook never squeezes it out of the window
+        self.status = ttk.Label(root, anchor=tk.W)
+        self.status.pack(side=tk.BOTTOM, fill=tk.X, padx=5, pady=(0, 5))
+        self._status_after = None
+        
         # Create main frame with notebook for tabs
         self.notebook = ttk.Notebook(root)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -68,6 +317,18 @@ class ConfigEditorApp:
         # Create visualization tab
         self.graph_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.graph_frame, text="State Visualization")
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        
+        # Editor shown for each kind of tree item, keyed by the first of its values
+        self._editor_dispatch = {
+            "root": lambda values: self.show_root_editor(),
+            "initial_state": lambda values: self.show_initial_state_editor(),
+            "description": lambda values: (self.show_description_field_editor(values[1]) if len(values) > 1
+                                           else self.show_description_editor()),
+            "states": lambda values: (self.show_states_editor() if len(values) == 1
+                                      else self.show_state_editor(values[1]) if len(values) == 2
+                                      else self.show_state_field_editor(values[1], values[2])),
+        }
         
         # Setup the editor interface
         self.setup_editor_interface()
@@ -78,6 +339,20 @@ class ConfigEditorApp:
         # Load initial configuration
         self.load_config()
         
+    @property
+    def state_names(self):
+        """
+        Names of the configured states, in configuration order.
+        
+        The tuple is cached until states are loaded, added or deleted.
+        
+        Returns:
+            tuple: The state names
+        """
+        if self._states_tuple_cache is None:
+            self._states_tuple_cache = tuple(self.config_data.get('states', {}))
+        return self._states_tuple_cache
+    
     def setup_editor_interface(self):
         """
         Initialize the editor interface with tree navigation and editing panels.
@@ -97,10 +372,22 @@ class ConfigEditorApp:
         self.right_panel = ttk.Frame(self.main_frame)
         self.right_panel.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
         
+        # Frame holding the current editor, replaced on every selection, and
+        # the Tk variables it uses. Variables of replaced editors are pooled
+        # for reuse instead of being created again for every editor
+        self.editor_panel = None
+        self._panel_vars = []
+        self._var_pool = {kind: [] for kind in _VAR_TYPES}
+        
+        # The state editor is built on first use and then kept, see show_state_editor
+        self._state_frame = None
+        self._state_editor_name = None
+        
         # Create treeview for navigation
         self.tree = ttk.Treeview(self.left_panel)
         self.tree.pack(fill=tk.BOTH, expand=True)
         self.tree.bind("<<TreeviewSelect>>", self.on_tree_select)
+        self.tree.bind("<<TreeviewOpen>>", self.on_tree_open)
         
         # Create frame for buttons
         self.btn_frame = ttk.Frame(self.left_panel)
@@ -128,7 +415,7 @@ class ConfigEditorApp:
         self.graph_controls.pack(fill=tk.X, padx=10, pady=10)
         
         # Add refresh button
-        self.refresh_graph_btn = ttk.Button(self.graph_controls, text="Refresh Graph", command=self.update_graph)
+        self.refresh_graph_btn = ttk.Button(self.graph_controls, text="Refresh Graph", command=lambda: self.update_graph(force=True))
         self.refresh_graph_btn.pack(side=tk.LEFT, padx=5)
         
         # Add layout options
@@ -137,30 +424,145 @@ class ConfigEditorApp:
         layouts = ["spring", "circular", "kamada_kawai", "planar", "random", "shell", "spectral"]
         self.layout_combo = ttk.Combobox(self.graph_controls, textvariable=self.layout_var, values=layouts)
         self.layout_combo.pack(side=tk.LEFT, padx=5)
-        self.layout_combo.bind("<<ComboboxSelected>>", lambda e: self.update_graph())
+        self.layout_combo.bind("<<ComboboxSelected>>", self._on_layout_change)
+        self._layout_after = None
         
         # Create frame for the graph
         self.graph_container = ttk.Frame(self.graph_frame)
         self.graph_container.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # Canvas for the graph will be created when needed
-        self.canvas = None
+        # The graph is drawn to an image on a worker thread (see _render_layout)
+        # and shown on this canvas
+        self.graph_canvas = tk.Canvas(self.graph_container, background="white", highlightthickness=0)
+        self.graph_canvas.pack(fill=tk.BOTH, expand=True)
+        self._graph_image = None
+        self._graph_image_item = self.graph_canvas.create_image(0, 0, anchor=tk.NW)
+        self.graph_canvas.bind("<Configure>", self._on_graph_resize)
+        self._resize_after = None
+        
+    def set_status(self, text):
+        """
+        Show a message in the status bar and clear it after a few seconds.
+        
+        Args:
+            text (str): The message to show
+        """
+        if self._status_after is not None:
+            self.root.after_cancel(self._status_after)
+        self.status.config(text=text)
+        self._status_after = self.root.after(_STATUS_CLEAR_MS, self._clear_status)
+    
+    def _clear_status(self):
+        """Clear the status bar message."""
+        self._status_after = None
+        self.status.config(text="")
+    
+    def request_graph_update(self):
+        """
+        Schedule a graph update, coalescing requests made in quick succession.
+        
+        Edits call this instead of update_graph, so a burst of changes from one
+        user action redraws the graph only once. While the visualization tab
+        is hidden the graph is only marked as outdated, and it is redrawn when
+        the tab is shown.
+        """
+        self._graph_dirty = True
+        if self._graph_visible and self._graph_after_id is None:
+            self._graph_after_id = self.root.after(_REFRESH_DELAY_MS, self._flush_graph_update)
+    
+    def _flush_graph_update(self):
+        """Run the graph update requested through request_graph_update."""
+        self._graph_after_id = None
+        if self._graph_dirty and self._graph_visible:
+            self._graph_dirty = False
+            self.update_graph()
+    
+    def _on_tab_changed(self, event):
+        """
+        Track whether the visualization tab is shown and redraw an outdated graph when it is.
+        
+        Args:
+            event: The Tkinter event object
+        """
+        self._graph_visible = self.notebook.select() == str(self.graph_frame)
+        if self._graph_visible and self._graph_dirty:
+            if self._graph_after_id is not None:
+                self.root.after_cancel(self._graph_after_id)
+            self._flush_graph_update()
+    
+    def request_tree_update(self):
+        """
+        Schedule a navigation tree update, coalescing requests made in quick succession.
+        """
+        self._tree_dirty = True
+        if self._tree_after_id is None:
+            self._tree_after_id = self.root.after(_REFRESH_DELAY_MS, self._flush_tree_update)
+    
+    def _flush_tree_update(self):
+        """Run the tree update requested through request_tree_update."""
+        self._tree_after_id = None
+        if self._tree_dirty:
+            self._tree_dirty = False
+            self.populate_tree()
+    
+    def _on_layout_change(self, event):
+        """
+        Redraw the graph shortly after the layout selection changes.
+        
+        Selections made in quick succession are coalesced, so only the last
+        one computes a layout.
         
+        Args:
+            event: The Tkinter event object
+        """
+        if self._layout_after is not None:
+            self.root.after_cancel(self._layout_after)
+        self._layout_after = self.root.after(_LAYOUT_CHANGE_DELAY_MS, self._apply_layout_change)
+    
+    def _apply_layout_change(self):
+        """Redraw the graph with the selected layout."""
+        self._layout_after = None
+        self.update_graph()
+    
     def load_config(self):
         """
         Load the TOML configuration file from disk.
         
         This method reads the configuration file, parses it as TOML,
         populates the navigation tree, and updates the graph visualization.
+        If the file hasn't changed since it was last parsed, the cached
+        result is reused instead of parsing it again.
         
-        Displays success or error messages to the user.
+        Reports success in the status bar and errors in a message box.
         """
         try:
-            with open(self.config_path, "rb") as f:
-                self.config_data = tomllib.load(f)
+            st = os.stat(self.config_path)
+            if self._parse_cache and self._parse_cache[:2] == (st.st_mtime_ns, st.st_size):
+                parsed = self._parse_cache[2]
+            else:
+                # Map the file and decode the text straight from the mapping,
+                # without reading it into an intermediate bytes object first
+                # (empty files can't be mapped)
+                text = ""
+                if st.st_size:
+                    with open(self.config_path, "rb") as f, \
+                            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        text = str(mm, "utf-8")
+                parsed = _toml_loads(text)
+                self._parse_cache = (st.st_mtime_ns, st.st_size, parsed)
+            
+            # Edit a copy so the cached result stays as it is on disk, with
+            # transitions held as sets while editing (saved as sorted lists)
+            self.config_data = copy.deepcopy(parsed)
+            for state_data in self.config_data.get('states', {}).values():
+                if 'transitions' in state_data:
+                    state_data['transitions'] = set(state_data['transitions'])
+            self._states_tuple_cache = None
+            self._template_options_cache = None
+            self._graph_pos = {}
             self.populate_tree()
-            self.update_graph()
-            messagebox.showinfo("Success", "Configuration loaded successfully")
+            self.request_graph_update()
+            self.set_status(f"Loaded {self.config_path}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load configuration: {str(e)}")
     
@@ -168,40 +570,190 @@ class ConfigEditorApp:
         """
         Populate the navigation tree with configuration data.
         
-        This method clears the existing tree and rebuilds it based on the
-        current configuration data, including root items, description fields,
-        states, and their properties.
+        This method brings the tree in line with the current configuration
+        data, including root items, description fields, states, and their
+        properties. Only items that were added, removed, renamed or reordered
+        are touched, so the expanded items and scroll position are kept.
+        
+        The field items of a state are only inserted once the state is first
+        expanded (see on_tree_open); until then the state item has a single
+        placeholder child, so that it can be expanded at all.
         """
-        # Clear existing tree
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        if self._in_populate_tree:
+            self._tree_dirty = True
+            return
+        
+        self._in_populate_tree = True
+        self._tree_dirty = False
+        try:
+            self._populate_tree()
+        finally:
+            self._in_populate_tree = False
+        if self._tree_dirty:
+            self.request_tree_update()
+    
+    def _populate_tree(self):
+        """Apply the differences between the configuration and the tree, see populate_tree."""
+        # Build the desired tree: each item's path (also stored as its values)
+        # maps to its parent's path and text, parents before children
+        items = {}
+        children = {}
+        
+        def add(parent, path, text):
+            items[path] = (parent, text)
+            children.setdefault(parent, []).append(path)
         
         # Add root items
-        root_id = self.tree.insert("", "end", text="Configuration Root", values=["root"])
+        add(None, ("root",), "Configuration Root")
         
         # Add basic configuration
         if "initial_state" in self.config_data:
-            self.tree.insert(root_id, "end", text=f"Initial State: {self.config_data['initial_state']}", 
-                            values=["initial_state"])
+            add(("root",), ("initial_state",), f"Initial State: {self.config_data['initial_state']}")
         
         # Add description
         if "description" in self.config_data:
-            desc_id = self.tree.insert(root_id, "end", text="Description", values=["description"])
+            add(("root",), ("description",), "Description")
             for key in self.config_data["description"]:
-                self.tree.insert(desc_id, "end", text=key, values=["description", key])
+                add(("description",), ("description", key), key)
         
         # Add states
         if "states" in self.config_data:
-            states_id = self.tree.insert(root_id, "end", text="States", values=["states"])
+            add(("root",), ("states",), "States")
             for state_name in self.config_data["states"]:
-                state_id = self.tree.insert(states_id, "end", text=state_name, values=["states", state_name])
-                for key in self.config_data["states"][state_name]:
-                    self.tree.insert(state_id, "end", text=key, values=["states", state_name, key])
+                add(("states",), ("states", state_name), state_name)
+                if state_name in self._tree_loaded_states:
+                    for key in self.config_data["states"][state_name]:
+                        add(("states", state_name), ("states", state_name, key), key)
+        self._tree_loaded_states.intersection_update(self.config_data.get("states", ()))
+        
+        # Remove items that no longer exist; deleting an item also deletes its
+        # children, so only the topmost removed items are deleted explicitly
+        removed = [path for path in self._tree_items if path not in items]
+        for path in removed:
+            parent = self._tree_nodes[path][0]
+            if parent is None or parent in items:
+                self.tree.delete(self._tree_items[path])
+        for path in removed:
+            del self._tree_items[path]
+        
+        # Create the root item first, expanded, so that it can be detached
+        # while its descendants are inserted, on the first load too
+        root_path = ("root",)
+        if root_path not in self._tree_items:
+            self._tree_items[root_path] = self.tree.insert("", "end", iid=_tree_iid(root_path), text=items[root_path][1],
+                                                           values=list(root_path), open=True)
+            self._tree_nodes[root_path] = items[root_path]
+        
+        # Insert many new items while the tree contents are detached, and
+        # reattach them once everything is in place
+        root_iid = self._tree_items[root_path]
+        batch = sum(path not in self._tree_items for path in items) >= _TREE_BATCH_MIN_ITEMS
+        if batch:
+            self.tree.detach(root_iid)
+        
+        # Insert new items and update the text of changed ones
+        for path, (parent, text) in items.items():
+            iid = self._tree_items.get(path)
+            if iid is None:
+                self._tree_items[path] = self.tree.insert(self._tree_items[parent], "end", iid=_tree_iid(path),
+                                                          text=text, values=list(path))
+                if parent == ("states",) and path[1] not in self._tree_loaded_states:
+                    self.tree.insert(self._tree_items[path], "end", iid=_TREE_PLACEHOLDER_PREFIX + path[1], text="...")
+            elif self._tree_nodes[path][1] != text:
+                self.tree.item(iid, text=text)
+        
+        # Restore the configuration order where children were added or reordered
+        for parent, child_paths in children.items():
+            if parent is not None and child_paths != self._tree_children.get(parent):
+                self.tree.set_children(self._tree_items[parent], *(self._tree_items[path] for path in child_paths))
+        
+        if batch:
+            self.tree.move(root_iid, "", 0)
+        
+        self._tree_nodes = items
+        self._tree_children = children
+    
+    def _insert_tree_item(self, parent, path, text):
+        """
+        Insert a single tree item, keeping the bookkeeping used by populate_tree in sync.
+        
+        Args:
+            parent (tuple): The values path of the parent item
+            path (tuple): The values path of the new item
+            text (str): The item text
+        """
+        self._tree_items[path] = self.tree.insert(self._tree_items[parent], "end", iid=_tree_iid(path),
+                                                  text=text, values=list(path))
+        self._tree_nodes[path] = (parent, text)
+        self._tree_children.setdefault(parent, []).append(path)
+    
+    def _insert_state_tree_item(self, state_name):
+        """
+        Insert the tree item of a newly added state.
+        
+        Args:
+            state_name (str): The name of the new state
+            
+        Keeps the bookkeeping used by populate_tree in sync, so the whole
+        tree doesn't need to be diffed for a single new state. Like every
+        state, its field items are inserted when it is first expanded.
+        """
+        if ("states",) not in self._tree_items:
+            # No "States" item yet, let populate_tree create it
+            self.request_tree_update()
+            return
+        
+        self._insert_tree_item(("states",), ("states", state_name), state_name)
+        self.tree.insert(self._tree_items[("states", state_name)], "end",
+                         iid=_TREE_PLACEHOLDER_PREFIX + state_name, text="...")
+    
+    def on_tree_open(self, event):
+        """
+        Handle the expansion of a tree item.
+        
+        Args:
+            event: The tkinter event object
+            
+        The first time a state is expanded, its placeholder child is replaced
+        by the state's field items. The event is generated before the item
+        opens, so the fields are shown right away.
+        """
+        values = self.tree.item(self.tree.focus(), "values")
+        if len(values) != 2 or values[0] != "states":
+            return
+        
+        state_name = values[1]
+        state_path = ("states", state_name)
+        if state_name in self._tree_loaded_states or state_name not in self.config_data.get('states', {}):
+            return
+        
+        self._tree_loaded_states.add(state_name)
+        self.tree.delete(_TREE_PLACEHOLDER_PREFIX + state_name)
+        for key in self.config_data['states'][state_name]:
+            self._insert_tree_item(state_path, state_path + (key,), key)
+    
+    def _delete_state_tree_item(self, state_name):
+        """
+        Delete the tree items of a removed state and its fields.
+        
+        Args:
+            state_name (str): The name of the removed state
+        """
+        state_path = ("states", state_name)
+        iid = self._tree_items.pop(state_path, None)
+        if iid is None:
+            return
         
-        # Expand all
-        self.tree.item(root_id, open=True)
+        # Deleting the state item also deletes its field items (or placeholder)
+        self.tree.delete(iid)
+        self._tree_loaded_states.discard(state_name)
+        del self._tree_nodes[state_path]
+        self._tree_children[("states",)].remove(state_path)
+        for field_path in self._tree_children.pop(state_path, ()):
+            del self._tree_items[field_path]
+            del self._tree_nodes[field_path]
     
-    def update_graph(self):
+    def update_graph(self, force=False):
         """
         Update the state machine visualization graph.
         
@@ -209,104 +761,286 @@ class ConfigEditorApp:
         the current configuration data, applying the selected layout algorithm.
         The graph shows states as nodes and transitions as edges, with special
         highlighting for the initial state.
+        
+        Layouts that aren't cached yet are computed on a background thread so
+        the UI stays responsive; the graph is drawn once the layout is ready.
+        
+        Args:
+            force (bool): Redraw even if the graph hasn't changed since the last update
         """
-        if not self.config_data or 'states' not in self.config_data:
+        if self._in_update_graph:
+            self._graph_dirty = True
             return
         
-        # Clear the existing graph container
-        for widget in self.graph_container.winfo_children():
-            widget.destroy()
+        self._in_update_graph = True
+        self._graph_dirty = False
+        try:
+            self._update_graph(force)
+        finally:
+            self._in_update_graph = False
+        if self._graph_dirty:
+            self.request_graph_update()
+    
+    def _update_graph(self, force):
+        """
+        Build the graph and start drawing it, see update_graph.
+        
+        Args:
+            force (bool): Redraw even if the graph hasn't changed since the last update
+        """
+        if not self.config_data or 'states' not in self.config_data:
+            return
         
-        # Create a new figure
-        fig, ax = plt.subplots(figsize=(10, 8))
+        states = self.config_data['states']
+        initial_state = self.config_data.get('initial_state')
+        layout_name = self.layout_var.get()
         
-        # Create a directed graph
+        # Skip the update if nothing that is drawn has changed since the last one
+        graph_sig = (layout_name, initial_state,
+                     tuple((state_name, frozenset(state_data.get('transitions', ()))) for state_name, state_data in states.items()))
+        if graph_sig == self._last_graph_sig and not force:
+            return
+        self._last_graph_sig = graph_sig
+        
+        # Create a directed graph of the states, with the transitions to known
+        # states as edges. The graph is never changed after this, so the worker
+        # threads use it as it is
+        edges = [(state_name, target)
+                 for state_name, state_data in states.items()
+                 for target in state_data.get('transitions', ())
+                 if target in states]
         G = nx.DiGraph()
+        G.add_nodes_from(states)
+        G.add_edges_from(edges)
+        
+        # Only the most recent request is drawn; older layouts still in progress
+        # are cached when they finish but not drawn
+        self._layout_generation += 1
+        
+        # Reuse the positions computed for the same layout and topology
+        layout_key = (layout_name, frozenset(states), frozenset(edges))
+        pos = self._layout_cache.get(layout_key)
+        if pos is not None:
+            self._render_layout(G, pos, layout_name)
+            return
         
-        # Add nodes (states)
-        for state_name in self.config_data['states']:
-            # Add color highlight for initial state
-            if self.config_data.get('initial_state') == state_name:
-                G.add_node(state_name, initial=True)
-            else:
-                G.add_node(state_name, initial=False)
+        # Spring layouts keep the states already drawn where they are; without
+        # new states there is nothing to compute at all
+        fixed_pos = None
+        if layout_name == "spring" and self._graph_pos:
+            fixed_pos = {state_name: self._graph_pos[state_name] for state_name in G if state_name in self._graph_pos}
+            if len(fixed_pos) == len(G):
+                self._layout_cache[layout_key] = fixed_pos
+                self._render_layout(G, fixed_pos, layout_name)
+                return
         
-        # Add edges (transitions)
-        for state_name, state_data in self.config_data['states'].items():
-            if 'transitions' in state_data:
-                for target in state_data['transitions']:
-                    if target in self.config_data['states']:
-                        G.add_edge(state_name, target)
+        # Compute the layout on a worker thread; the result is picked up by
+        # _poll_layout_results on the Tk thread
+        self._layout_jobs += 1
+        worker = threading.Thread(target=self._compute_layout_and_post,
+                                  args=(G, layout_name, layout_key, self._layout_generation, fixed_pos),
+                                  daemon=True)
+        worker.start()
+        if self._layout_jobs == 1:
+            self.root.after(_LAYOUT_POLL_MS, self._poll_layout_results)
+    
+    @staticmethod
+    def _compute_layout(G, layout_name, fixed_pos=None):
+        """
+        Compute node positions for the graph with the given layout algorithm.
         
-        # Get the layout algorithm
-        layout_name = self.layout_var.get()
+        Args:
+            G (nx.DiGraph): The state machine graph
+            layout_name (str): Name of the layout algorithm
+            fixed_pos (dict): For the spring layout, positions of states to keep in place
+            
+        Returns:
+            dict: Mapping of state name to position
+        """
         if layout_name == "spring":
-            pos = nx.spring_layout(G, seed=42)
+            return _spring_layout(G, fixed_pos)
         elif layout_name == "circular":
-            pos = nx.circular_layout(G)
+            return nx.circular_layout(G)
         elif layout_name == "kamada_kawai":
-            pos = nx.kamada_kawai_layout(G)
+            return nx.kamada_kawai_layout(G)
         elif layout_name == "planar":
-            try:
-                pos = nx.planar_layout(G)
-            except:
-                pos = nx.spring_layout(G, seed=42)  # Fallback if graph is not planar
+            # Test planarity once and lay out from the embedding it returns,
+            # falling back to a spring layout if the graph is not planar
+            is_planar, embedding = nx.check_planarity(G)
+            return nx.planar_layout(embedding) if is_planar else _spring_layout(G)
         elif layout_name == "random":
-            pos = nx.random_layout(G, seed=42)
+            return nx.random_layout(G, seed=42)
         elif layout_name == "shell":
-            pos = nx.shell_layout(G)
+            return nx.shell_layout(G)
         elif layout_name == "spectral":
-            pos = nx.spectral_layout(G)
+            return nx.spectral_layout(G)
         else:
-            pos = nx.spring_layout(G, seed=42)
+            return _spring_layout(G)
+    
+    def _compute_layout_and_post(self, G, layout_name, layout_key, generation, fixed_pos=None):
+        """
+        Compute a layout on a worker thread and queue the result for the Tk thread.
         
-        # Create node lists by type for coloring
-        initial_nodes = [n for n, attr in G.nodes(data=True) if attr.get('initial', False)]
-        regular_nodes = [n for n, attr in G.nodes(data=True) if not attr.get('initial', False)]
+        Tk must only be used from the main thread, so the result (or the
+        exception raised while computing it) is passed back through a queue.
         
-        # Draw the nodes
-        nx.draw_networkx_nodes(G, pos, nodelist=initial_nodes, node_color='lightgreen', node_size=700, ax=ax)
-        nx.draw_networkx_nodes(G, pos, nodelist=regular_nodes, node_color='skyblue', node_size=500, ax=ax)
+        Args:
+            G (nx.DiGraph): The state machine graph
+            layout_name (str): Name of the layout algorithm
+            layout_key (tuple): Layout cache key for the graph
+            generation (int): Value of the layout generation when the graph was built
+            fixed_pos (dict): For the spring layout, positions of states to keep in place
+        """
+        try:
+            pos = self._compute_layout(G, layout_name, fixed_pos)
+        except Exception as e:
+            pos = e
+        self._layout_results.put((G, layout_key, generation, pos))
+    
+    def _poll_layout_results(self):
+        """
+        Cache finished layouts and draw the latest one, polling until no layout is pending.
+        """
+        while True:
+            try:
+                G, layout_key, generation, pos = self._layout_results.get_nowait()
+            except queue.Empty:
+                break
+            self._layout_jobs -= 1
+            
+            if isinstance(pos, Exception):
+                if generation == self._layout_generation:
+                    self._last_graph_sig = None  # Let the next update try again
+                    messagebox.showerror("Error", f"Failed to compute graph layout: {str(pos)}")
+                continue
+            
+            self._layout_cache[layout_key] = pos
+            if generation == self._layout_generation:
+                self._render_layout(G, pos, layout_key[0])
         
-        # Draw the edges
-        nx.draw_networkx_edges(G, pos, width=1.0, alpha=0.7, arrowsize=20, ax=ax)
+        if self._layout_jobs:
+            self.root.after(_LAYOUT_POLL_MS, self._poll_layout_results)
+    
+    def _render_layout(self, G, pos, layout_name):
+        """
+        Draw the graph with the given node positions.
         
-        # Draw the labels
-        nx.draw_networkx_labels(G, pos, font_size=10, font_family='sans-serif', ax=ax)
+        Args:
+            G (nx.DiGraph): The state machine graph
+            pos (dict): Mapping of state name to position
+            layout_name (str): Name of the layout algorithm the positions come from
+        """
+        if layout_name == "spring":
+            self._graph_pos = pos
         
-        # Remove the axis
-        ax.set_axis_off()
+        self._graph_drawing = (G, pos, self.config_data.get('initial_state'))
+        self._start_render()
+    
+    def _start_render(self):
+        """
+        Have the render worker draw the current graph, at the size of the graph area.
         
-        # Add title
-        plt.title("State Machine Visualization", fontsize=16)
+        Rendering a large graph takes a while, so it is kept off the Tk thread;
+        the image is shown by _poll_render_results when it is ready. A drawing
+        the worker hasn't started yet is replaced by this one.
+        """
+        width, height = self.graph_canvas.winfo_width(), self.graph_canvas.winfo_height()
+        size = (width, height) if width > 1 and height > 1 else _GRAPH_DEFAULT_SIZE
+        self._graph_render_size = size
+        
+        self._render_generation += 1
+        with self._render_cond:
+            self._render_slot = self._graph_drawing + (size, self._render_generation)
+            self._render_cond.notify()
+        
+        if self._render_thread is None:
+            self._render_thread = threading.Thread(target=self._render_worker, name="graph-render", daemon=True)
+            self._render_thread.start()
+        if not self._render_polling:
+            self._render_polling = True
+            self.root.after(_LAYOUT_POLL_MS, self._poll_render_results)
+    
+    def _render_worker(self):
+        """
+        Render thread: draw the latest requested graph and queue the image for the Tk thread.
         
-        # Add legend
-        import matplotlib.patches as mpatches
-        initial_patch = mpatches.Patch(color='lightgreen', label='Initial State')
-        regular_patch = mpatches.Patch(color='skyblue', label='Regular State')
-        plt.legend(handles=[initial_patch, regular_patch], loc='upper right')
+        Runs until the application exits, waiting for the next request in the slot.
+        """
+        while True:
+            with self._render_cond:
+                while self._render_slot is None:
+                    self._render_cond.wait()
+                G, pos, initial_state, size, generation = self._render_slot
+                self._render_slot = None
+            
+            try:
+                image = _render_graph_png(G, pos, initial_state, size)
+            except Exception as e:
+                image = e
+            self._render_results.put((generation, image))
+    
+    def _poll_render_results(self):
+        """
+        Show the latest finished drawing, polling until the latest requested one is shown.
+        """
+        while True:
+            try:
+                generation, image = self._render_results.get_nowait()
+            except queue.Empty:
+                break
+            self._render_done = max(self._render_done, generation)
+            if generation != self._render_generation:
+                continue
+            
+            if isinstance(image, Exception):
+                messagebox.showerror("Error", f"Failed to draw graph: {str(image)}")
+            else:
+                # Keep a reference to the image, Tk doesn't
+                self._graph_image = tk.PhotoImage(master=self.graph_canvas, data=base64.b64encode(image))
+                self.graph_canvas.itemconfigure(self._graph_image_item, image=self._graph_image)
         
-        # Create canvas
-        canvas = FigureCanvasTkAgg(fig, master=self.graph_container)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        if self._render_done < self._render_generation:
+            self.root.after(_LAYOUT_POLL_MS, self._poll_render_results)
+        else:
+            self._render_polling = False
+    
+    def _on_graph_resize(self, event):
+        """
+        Redraw the graph shortly after the graph area changes size.
         
-        # Store reference to canvas
-        self.canvas = canvas
+        Args:
+            event: The Tkinter event object
+        """
+        if self._resize_after is not None:
+            self.root.after_cancel(self._resize_after)
+        self._resize_after = self.root.after(_GRAPH_RESIZE_DELAY_MS, self._apply_graph_resize)
+    
+    def _apply_graph_resize(self):
+        """Redraw the graph if the graph area size differs from the drawing's."""
+        self._resize_after = None
+        size = (self.graph_canvas.winfo_width(), self.graph_canvas.winfo_height())
+        if self._graph_drawing is not None and min(size) > 1 and size != self._graph_render_size:
+            self._start_render()
     
     def on_tree_select(self, event):
         """
         Handle tree item selection events.
         
-        This method clears the right panel and shows the appropriate editor
-        based on the selected tree item.
+        This method replaces the editor in the right panel with the one
+        matching the selected tree item.
         
         Args:
             event: The Tkinter event object (can be None when called programmatically)
         """
-        # Clear right panel
-        for widget in self.right_panel.winfo_children():
-            widget.destroy()
+        # Swap in an empty editor frame; the old one is hidden now and destroyed
+        # once Tk is idle, keeping the teardown off the click's critical path
+        old_panel, old_vars = self.editor_panel, self._panel_vars
+        self.editor_panel = ttk.Frame(self.right_panel)
+        self.editor_panel.pack(fill=tk.BOTH, expand=True)
+        self._panel_vars = []
+        if old_panel is not None:
+            old_panel.pack_forget()
+            self.root.after_idle(self._release_editor_panel, old_panel, old_vars)
         
         # Get selected item
         selected_item = self.tree.selection()[0]
@@ -316,22 +1050,39 @@ class ConfigEditorApp:
             return
         
         # Show appropriate editor based on selection
-        if values[0] == "root":
-            self.show_root_editor()
-        elif values[0] == "initial_state":
-            self.show_initial_state_editor()
-        elif values[0] == "description":
-            if len(values) > 1:
-                self.show_description_field_editor(values[1])
-            else:
-                self.show_description_editor()
-        elif values[0] == "states":
-            if len(values) == 1:
-                self.show_states_editor()
-            elif len(values) == 2:
-                self.show_state_editor(values[1])
-            elif len(values) == 3:
-                self.show_state_field_editor(values[1], values[2])
+        handler = self._editor_dispatch.get(values[0])
+        if handler:
+            handler(values)
+    
+    def _get_var(self, kind, value):
+        """
+        Get a Tk variable for the current editor, reusing a pooled one if possible.
+        
+        Args:
+            kind (str): "str", "double" or "bool"
+            value: The initial value of the variable
+            
+        Returns:
+            tk.Variable: The variable, returned to the pool when the editor is replaced
+        """
+        pool = self._var_pool[kind]
+        var = pool.pop() if pool else _VAR_TYPES[kind](self.root)
+        var.set(value)
+        self._panel_vars.append((kind, var))
+        return var
+    
+    def _release_editor_panel(self, panel, panel_vars):
+        """
+        Destroy a replaced editor frame and return its Tk variables to the pool.
+        
+        Args:
+            panel (ttk.Frame): The editor frame
+            panel_vars (list): (kind, variable) pairs handed out for the frame
+        """
+        # Destroying the widgets first removes their traces on the variables
+        panel.destroy()
+        for kind, var in panel_vars:
+            self._var_pool[kind].append(var)
     
     def show_root_editor(self):
         """
@@ -340,7 +1091,7 @@ class ConfigEditorApp:
         This method shows a summary of the configuration file, including
         the path, initial state, and a list of available states.
         """
-        frame = ttk.LabelFrame(self.right_panel, text="Configuration Overview")
+        frame = ttk.LabelFrame(self.editor_panel, text="Configuration Overview")
         frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         # Show configuration summary
@@ -350,7 +1101,7 @@ class ConfigEditorApp:
         Number of States: {len(self.config_data.get('states', {}))}
         
         States:
-        {', '.join(list(self.config_data.get('states', {}).keys()))}
+        {', '.join(self.state_names)}
         """
         
         info_label = ttk.Label(frame, text=info_text, justify=tk.LEFT, padding=10)
@@ -363,16 +1114,16 @@ class ConfigEditorApp:
         This method creates a dropdown for selecting the initial state
         from the available states in the configuration.
         """
-        frame = ttk.LabelFrame(self.right_panel, text="Initial State")
+        frame = ttk.LabelFrame(self.editor_panel, text="Initial State")
         frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         # Create dropdown for initial state
         state_label = ttk.Label(frame, text="Initial State:")
         state_label.pack(pady=(10, 5))
         
-        state_var = tk.StringVar(value=self.config_data.get('initial_state', ''))
+        state_var = self._get_var('str', self.config_data.get('initial_state', ''))
         state_dropdown = ttk.Combobox(frame, textvariable=state_var)
-        state_dropdown['values'] = list(self.config_data.get('states', {}).keys())
+        state_dropdown['values'] = self.state_names
         state_dropdown.pack(pady=(0, 10))
         
         # Save button
@@ -395,32 +1146,77 @@ class ConfigEditorApp:
             return
         
         self.config_data['initial_state'] = new_state
-        self.populate_tree()
-        self.update_graph()  # Update the graph to show new initial state
-        messagebox.showinfo("Success", f"Initial state updated to {new_state}")
+        self.request_tree_update()
+        self.request_graph_update()  # Update the graph to show new initial state
+        self.set_status(f"Initial state updated to {new_state}")
     
     def show_description_editor(self):
         """
         Display the description editor.
         
-        This method creates text widgets for each description field
-        in the configuration, allowing the user to edit them.
+        This method lists the description fields in the configuration and
+        shows a single text widget for editing the selected one, so the
+        number of widgets doesn't grow with the number of fields.
         """
-        frame = ttk.LabelFrame(self.right_panel, text="Description")
+        frame = ttk.LabelFrame(self.editor_panel, text="Description")
         frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # Create a scrolled text widget for each description field
-        for key in self.config_data.get('description', {}):
-            field_frame = ttk.LabelFrame(frame, text=key)
-            field_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        fields = list(self.config_data.get('description', {}))
+        
+        # Create a listbox of description fields
+        listbox = tk.Listbox(frame, exportselection=False, width=25)
+        for key in fields:
+            listbox.insert(tk.END, key)
+        listbox.pack(side=tk.LEFT, fill=tk.Y, padx=5, pady=5)
+        
+        # Create one scrolled text widget, reused for whichever field is selected
+        field_frame = ttk.LabelFrame(frame, text="")
+        field_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        text_widget = scrolledtext.ScrolledText(field_frame, wrap=tk.WORD, height=10)
+        text_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        # Text edited but not applied with Update yet, per field, so that it
+        # survives switching to another field and back
+        selected = {"field": None}
+        pending = {}
+        
+        def on_select(event):
+            """Load the selected description field into the text widget."""
+            selection = listbox.curselection()
+            if not selection:
+                return
             
-            text_widget = scrolledtext.ScrolledText(field_frame, wrap=tk.WORD, height=10)
-            text_widget.insert(tk.END, self.config_data['description'][key])
-            text_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+            # Keep the unsaved text of the field being left
+            current = selected["field"]
+            if current is not None:
+                text = text_widget.get("1.0", "end-1c")
+                if text != self.config_data['description'][current]:
+                    pending[current] = text
+                else:
+                    pending.pop(current, None)
             
-            update_btn = ttk.Button(field_frame, text="Update", 
-                                   command=lambda k=key, t=text_widget: self.update_description_field(k, t.get("1.0", tk.END)))
-            update_btn.pack(pady=5)
+            key = fields[selection[0]]
+            selected["field"] = key
+            field_frame.config(text=key)
+            text_widget.delete("1.0", tk.END)
+            text_widget.insert(tk.END, pending.get(key, self.config_data['description'][key]))
+        
+        def on_update():
+            """Apply the text of the selected description field."""
+            if selected["field"]:
+                pending.pop(selected["field"], None)
+                self.update_description_field(selected["field"], text_widget.get("1.0", tk.END))
+        
+        listbox.bind("<<ListboxSelect>>", on_select)
+        
+        update_btn = ttk.Button(field_frame, text="Update", command=on_update)
+        update_btn.pack(pady=5)
+        
+        # Start with the first field selected
+        if fields:
+            listbox.selection_set(0)
+            on_select(None)
     
     def show_description_field_editor(self, field):
         """
@@ -431,7 +1227,7 @@ class ConfigEditorApp:
             
         Creates a text widget for editing the specified description field.
         """
-        frame = ttk.LabelFrame(self.right_panel, text=f"Description - {field}")
+        frame = ttk.LabelFrame(self.editor_panel, text=f"Description - {field}")
         frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         # Create a scrolled text widget for the description field
@@ -458,7 +1254,7 @@ class ConfigEditorApp:
             self.config_data['description'] = {}
         
         self.config_data['description'][field] = new_text.strip()
-        messagebox.showinfo("Success", f"Description field '{field}' updated")
+        self.set_status(f"Description field '{field}' updated")
     
     def show_states_editor(self):
         """
@@ -467,14 +1263,14 @@ class ConfigEditorApp:
         This method creates a listbox showing all available states
         with buttons for adding, deleting, and editing states.
         """
-        frame = ttk.LabelFrame(self.right_panel, text="States")
+        frame = ttk.LabelFrame(self.editor_panel, text="States")
         frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         # Create a listbox of states
         listbox_frame = ttk.Frame(frame)
         listbox_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        states_list = list(self.config_data.get('states', {}).keys())
+        states_list = self.state_names
         listbox = tk.Listbox(listbox_frame)
         for state in states_list:
             listbox.insert(tk.END, state)
@@ -507,29 +1303,50 @@ class ConfigEditorApp:
         Args:
             state_name (str): The name of the state to edit
             
-        Creates a tabbed interface with editors for each state property
-        (prompt, temperature, model, transitions).
+        Shows a tabbed interface with editors for each state property
+        (prompt, temperature, model, transitions). The widgets are created
+        once and shared by all states; showing a state only loads its values.
         """
-        frame = ttk.LabelFrame(self.right_panel, text=f"State: {state_name}")
-        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        if self._state_frame is None:
+            self._build_state_editor()
+        self._state_editor_name = state_name
+        state_data = self.config_data['states'][state_name]
+        
+        self._state_frame.configure(text=f"State: {state_name}")
+        self._state_prompt_text.delete("1.0", tk.END)
+        self._state_prompt_text.insert(tk.END, state_data.get('prompt', ''))
+        self._state_temp_var.set(state_data.get('temperature', 0.7))
+        self._state_model_var.set(state_data.get('model', ''))
+        self._state_trans_var.set(", ".join(sorted(state_data.get('transitions', ()))))
+        self._fill_transitions_listbox(self._state_trans_listbox, state_data.get('transitions', set()))
+        
+        # The frame belongs to the right panel and outlives the editor panel it
+        # is shown in; it is unpacked automatically when that panel is destroyed.
+        # Raise it above the panel, which was created later
+        self._state_frame.pack(in_=self.editor_panel, fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self._state_frame.lift(self.editor_panel)
+    
+    def _build_state_editor(self):
+        """
+        Create the widgets of the state editor shown by show_state_editor.
+        
+        The update buttons apply the values to the state currently shown.
+        """
+        frame = self._state_frame = ttk.LabelFrame(self.right_panel)
         
         # Create notebook for tabs
         notebook = ttk.Notebook(frame)
         notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # Create tabs for each field
-        state_data = self.config_data['states'][state_name]
-        
         # Prompt tab
         prompt_tab = ttk.Frame(notebook)
         notebook.add(prompt_tab, text="Prompt")
         
-        prompt_text = scrolledtext.ScrolledText(prompt_tab, wrap=tk.WORD)
-        prompt_text.insert(tk.END, state_data.get('prompt', ''))
+        prompt_text = self._state_prompt_text = scrolledtext.ScrolledText(prompt_tab, wrap=tk.WORD)
         prompt_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         prompt_btn = ttk.Button(prompt_tab, text="Update Prompt", 
-                               command=lambda: self.update_state_field(state_name, 'prompt', prompt_text.get("1.0", tk.END)))
+                               command=lambda: self.update_state_field(self._state_editor_name, 'prompt', prompt_text.get("1.0", tk.END)))
         prompt_btn.pack(pady=10)
         
         # Temperature tab
@@ -539,7 +1356,7 @@ class ConfigEditorApp:
         temp_label = ttk.Label(temp_tab, text="Temperature (0.0 - 1.0):")
         temp_label.pack(pady=(10, 5))
         
-        temp_var = tk.DoubleVar(value=state_data.get('temperature', 0.7))
+        temp_var = self._state_temp_var = tk.DoubleVar(self.root)
         temp_slider = ttk.Scale(temp_tab, from_=0.0, to=1.0, variable=temp_var, orient=tk.HORIZONTAL)
         temp_slider.pack(fill=tk.X, padx=20, pady=5)
         
@@ -547,7 +1364,7 @@ class ConfigEditorApp:
         temp_value.pack(pady=5)
         
         temp_btn = ttk.Button(temp_tab, text="Update Temperature", 
-                             command=lambda: self.update_state_field(state_name, 'temperature', temp_var.get()))
+                             command=lambda: self.update_state_field(self._state_editor_name, 'temperature', temp_var.get()))
         temp_btn.pack(pady=10)
         
         # Model tab
@@ -557,16 +1374,15 @@ class ConfigEditorApp:
         model_label = ttk.Label(model_tab, text="Model:")
         model_label.pack(pady=(10, 5))
         
-        model_var = tk.StringVar(value=state_data.get('model', ''))
+        model_var = self._state_model_var = tk.StringVar(self.root)
         model_entry = ttk.Entry(model_tab, textvariable=model_var, width=40)
         model_entry.pack(pady=5)
         
-        model_options = ["llama3-70b-8192", "qwen/qwen-2.5-72b-instruct", "gpt-4o", "claude-3-opus-20240229"]
-        model_dropdown = ttk.Combobox(model_tab, textvariable=model_var, values=model_options)
+        model_dropdown = ttk.Combobox(model_tab, textvariable=model_var, values=MODEL_OPTIONS)
         model_dropdown.pack(pady=5)
         
         model_btn = ttk.Button(model_tab, text="Update Model", 
-                              command=lambda: self.update_state_field(state_name, 'model', model_var.get()))
+                              command=lambda: self.update_state_field(self._state_editor_name, 'model', model_var.get()))
         model_btn.pack(pady=10)
         
         # Transitions tab
@@ -576,26 +1392,18 @@ class ConfigEditorApp:
         trans_label = ttk.Label(trans_tab, text="Allowed Transitions (comma-separated):")
         trans_label.pack(pady=(10, 5))
         
-        trans_var = tk.StringVar(value=", ".join(state_data.get('transitions', [])))
-        trans_entry = ttk.Entry(trans_tab, textvariable=trans_var, width=40)
+        self._state_trans_var = tk.StringVar(self.root)
+        trans_entry = ttk.Entry(trans_tab, textvariable=self._state_trans_var, width=40)
         trans_entry.pack(pady=5)
         
-        # Add all states as checkbuttons
+        # Add all states to a multiple-selection list
         trans_frame = ttk.Frame(trans_tab)
         trans_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        trans_vars = {}
-        all_states = list(self.config_data['states'].keys())
-        current_transitions = state_data.get('transitions', [])
-        
-        for i, state in enumerate(all_states):
-            var = tk.BooleanVar(value=state in current_transitions)
-            trans_vars[state] = var
-            check = ttk.Checkbutton(trans_frame, text=state, variable=var)
-            check.grid(row=i//2, column=i%2, sticky=tk.W, padx=10, pady=5)
+        trans_listbox = self._state_trans_listbox = self.create_transitions_listbox(trans_frame, set())
         
         trans_btn = ttk.Button(trans_tab, text="Update Transitions", 
-                              command=lambda: self.update_transitions(state_name, trans_vars))
+                              command=lambda: self.update_transitions(self._state_editor_name, trans_listbox))
         trans_btn.pack(pady=10)
     
     def show_state_field_editor(self, state_name, field_name):
@@ -608,7 +1416,7 @@ class ConfigEditorApp:
             
         Creates an appropriate editor widget based on the field type.
         """
-        frame = ttk.LabelFrame(self.right_panel, text=f"State: {state_name} - {field_name}")
+        frame = ttk.LabelFrame(self.editor_panel, text=f"State: {state_name} - {field_name}")
         frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         state_data = self.config_data['states'][state_name]
@@ -629,7 +1437,7 @@ class ConfigEditorApp:
             temp_label = ttk.Label(frame, text="Temperature (0.0 - 1.0):")
             temp_label.pack(pady=(20, 10))
             
-            temp_var = tk.DoubleVar(value=field_value)
+            temp_var = self._get_var('double', field_value)
             temp_slider = ttk.Scale(frame, from_=0.0, to=1.0, variable=temp_var, orient=tk.HORIZONTAL, length=300)
             temp_slider.pack(pady=10)
             
@@ -645,17 +1453,16 @@ class ConfigEditorApp:
             model_label = ttk.Label(frame, text="Model:")
             model_label.pack(pady=(20, 10))
             
-            model_var = tk.StringVar(value=field_value)
+            model_var = self._get_var('str', field_value)
             model_entry = ttk.Entry(frame, textvariable=model_var, width=40)
             model_entry.pack(pady=10)
             
             # Add common model options
-            model_options = ["llama3-70b-8192", "qwen/qwen-2.5-72b-instruct", "gpt-4o", "claude-3-opus-20240229"]
             model_label = ttk.Label(frame, text="Common Models:")
             model_label.pack(pady=(20, 10))
             
             model_listbox = tk.Listbox(frame, height=5)
-            for model in model_options:
+            for model in MODEL_OPTIONS:
                 model_listbox.insert(tk.END, model)
             model_listbox.pack(pady=10)
             
@@ -671,22 +1478,14 @@ class ConfigEditorApp:
             trans_label = ttk.Label(frame, text="Allowed Transitions:")
             trans_label.pack(pady=(20, 10))
             
-            # Create checkbuttons for all available states
-            trans_vars = {}
+            # Create a multiple-selection list of all available states
             trans_frame = ttk.Frame(frame)
             trans_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
             
-            all_states = list(self.config_data['states'].keys())
-            current_transitions = field_value
-            
-            for i, state in enumerate(all_states):
-                var = tk.BooleanVar(value=state in current_transitions)
-                trans_vars[state] = var
-                check = ttk.Checkbutton(trans_frame, text=state, variable=var)
-                check.grid(row=i//2, column=i%2, sticky=tk.W, padx=10, pady=5)
+            trans_listbox = self.create_transitions_listbox(trans_frame, field_value)
             
             save_btn = ttk.Button(frame, text="Update", 
-                                 command=lambda: self.update_transitions(state_name, trans_vars))
+                                 command=lambda: self.update_transitions(state_name, trans_listbox))
             save_btn.pack(pady=20)
     
     def update_state_field(self, state_name, field_name, new_value):
@@ -705,27 +1504,66 @@ class ConfigEditorApp:
             new_value = new_value.strip()
         
         self.config_data['states'][state_name][field_name] = new_value
-        messagebox.showinfo("Success", f"Updated {field_name} for state {state_name}")
+        self.set_status(f"Updated {field_name} for state {state_name}")
         
         # If we updated transitions, refresh the graph
         if field_name == 'transitions':
-            self.update_graph()
+            self._layout_cache.clear()
+            self.request_graph_update()
     
-    def update_transitions(self, state_name, trans_vars):
+    def create_transitions_listbox(self, parent, current_transitions):
         """
-        Update the transitions for a state based on checkbox selections.
+        Create a multiple-selection list of all states for editing transitions.
+        
+        Args:
+            parent: The widget to place the list in
+            current_transitions (set): The states currently selected
+            
+        Returns:
+            tk.Listbox: The list, with the current transitions selected
+        """
+        listbox = tk.Listbox(parent, selectmode=tk.MULTIPLE, exportselection=False)
+        self._fill_transitions_listbox(listbox, current_transitions)
+        
+        scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=listbox.yview)
+        listbox.configure(yscrollcommand=scrollbar.set)
+        
+        listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        return listbox
+    
+    def _fill_transitions_listbox(self, listbox, current_transitions):
+        """
+        List all states in a transitions list, selecting the current transitions.
+        
+        Args:
+            listbox (tk.Listbox): List created by create_transitions_listbox
+            current_transitions (set): The states to select
+        """
+        listbox.delete(0, tk.END)
+        listbox.insert(tk.END, *self.state_names)
+        
+        for i, state in enumerate(self.state_names):
+            if state in current_transitions:
+                listbox.selection_set(i)
+    
+    def update_transitions(self, state_name, trans_listbox):
+        """
+        Update the transitions for a state based on the list selection.
         
         Args:
             state_name (str): The name of the state
-            trans_vars (dict): Dictionary mapping state names to BooleanVar objects
+            trans_listbox (tk.Listbox): List created by create_transitions_listbox
             
         Collects all selected transitions and updates the state configuration.
         """
         # Get all selected states
-        transitions = [state for state, var in trans_vars.items() if var.get()]
+        names = trans_listbox.get(0, tk.END)
+        transitions = {names[i] for i in trans_listbox.curselection()}
         self.config_data['states'][state_name]['transitions'] = transitions
-        messagebox.showinfo("Success", f"Updated transitions for state {state_name}")
-        self.update_graph()  # Refresh the graph with new transitions
+        self.set_status(f"Updated transitions for state {state_name}")
+        self._layout_cache.clear()
+        self.request_graph_update()  # Refresh the graph with new transitions
     
     def add_state(self):
         """
@@ -750,8 +1588,9 @@ class ConfigEditorApp:
         ttk.Label(dialog, text="Template (optional):").pack(pady=(20, 5))
         
         template_var = tk.StringVar()
-        template_options = ["Empty"] + list(self.config_data['states'].keys())
-        template_dropdown = ttk.Combobox(dialog, textvariable=template_var, values=template_options)
+        if self._template_options_cache is None:
+            self._template_options_cache = ("Empty",) + self.state_names
+        template_dropdown = ttk.Combobox(dialog, textvariable=template_var, values=self._template_options_cache)
         template_dropdown.pack(pady=5)
         template_dropdown.current(0)
         
@@ -776,16 +1615,20 @@ class ConfigEditorApp:
                     'prompt': f"This is the prompt for {state_name} state.",
                     'temperature': 0.7,
                     'model': 'qwen/qwen-2.5-72b-instruct',
-                    'transitions': []
+                    'transitions': set()
                 }
             else:
-                # Clone from template
+                # Clone from template; a deep copy so the new state doesn't share
+                # the template's transitions set
                 template = template_var.get()
-                self.config_data['states'][state_name] = dict(self.config_data['states'][template])
+                self.config_data['states'][state_name] = copy.deepcopy(self.config_data['states'][template])
+            self._states_tuple_cache = None
+            self._template_options_cache = None
             
-            self.populate_tree()
-            self.update_graph()  # Refresh the graph with new state
-            messagebox.showinfo("Success", f"Added new state: {state_name}")
+            self._insert_state_tree_item(state_name)
+            self._layout_cache.clear()
+            self.request_graph_update()  # Refresh the graph with new state
+            self.set_status(f"Added new state: {state_name}")
             dialog.destroy()
         
         ttk.Button(dialog, text="Add", command=on_add).pack(pady=20)
@@ -820,15 +1663,18 @@ class ConfigEditorApp:
         
         # Remove state
         del self.config_data['states'][state_name]
+        self._states_tuple_cache = None
+        self._template_options_cache = None
         
         # Update transitions in other states
         for other_state in self.config_data['states'].values():
-            if 'transitions' in other_state and state_name in other_state['transitions']:
-                other_state['transitions'].remove(state_name)
+            if 'transitions' in other_state:
+                other_state['transitions'].discard(state_name)
         
-        self.populate_tree()
-        self.update_graph()  # Refresh the graph without the deleted state
-        messagebox.showinfo("Success", f"Deleted state: {state_name}")
+        self._delete_state_tree_item(state_name)
+        self._layout_cache.clear()
+        self.request_graph_update()  # Refresh the graph without the deleted state
+        self.set_status(f"Deleted state: {state_name}")
     
     def edit_state(self, state_name):
         """
@@ -837,7 +1683,7 @@ class ConfigEditorApp:
         Args:
             state_name (str): The name of the state to edit
             
-        Finds the state in the navigation tree and selects it to show
+        Looks up the state in the navigation tree and selects it to show
         the state editor.
         """
         if not state_name:
@@ -848,15 +1694,26 @@ class ConfigEditorApp:
             messagebox.showerror("Error", f"State '{state_name}' not found")
             return
         
-        # Find the state item in the tree and select it
-        for state_item in self.tree.get_children():
-            if self.tree.item(state_item, "text") == "States":
-                for child in self.tree.get_children(state_item):
-                    if self.tree.item(child, "text") == state_name:
-                        self.tree.selection_set(child)
-                        self.tree.see(child)
-                        self.on_tree_select(None)
-                        return
+        # Look up the state item in the tree and select it
+        item = self._tree_items.get(("states", state_name))
+        if item is not None:
+            self.tree.selection_set(item)
+            self.tree.see(item)
+            self.on_tree_select(None)
+    
+    def _serializable_config(self):
+        """
+        Return the configuration in a form that can be written as TOML.
+        
+        Returns:
+            dict: The configuration data with each state's transitions as a sorted list
+        """
+        states = {
+            state_name: ({**state_data, 'transitions': sorted(state_data['transitions'])}
+                         if 'transitions' in state_data else state_data)
+            for state_name, state_data in self.config_data.get('states', {}).items()
+        }
+        return {**self.config_data, 'states': states} if 'states' in self.config_data else self.config_data
     
     def save_config(self):
         """
@@ -866,10 +1723,16 @@ class ConfigEditorApp:
         and displays a success or error message.
         """
         try:
-            # Convert to TOML and save
-            with open(self.config_path, "wb") as f:
-                tomli_write.dump(self.config_data, f)
-            messagebox.showinfo("Success", f"Configuration saved to {self.config_path}")
+            # Convert to TOML in memory first, so a serialization error leaves the
+            # file intact, then save it with a single write call; a payload larger
+            # than the buffer goes straight to the file without being copied
+            data = _toml_dumps(self._serializable_config()).encode("utf-8")
+            # Drop the parse cache first; a file rewritten within the timestamp
+            # resolution at the same size would otherwise look unchanged
+            self._parse_cache = None
+            with open(self.config_path, "wb", buffering=_SAVE_BUFFER_SIZE) as f:
+                f.write(data)
+            self.set_status(f"Configuration saved to {self.config_path}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save configuration: {str(e)}")
 
@@ -17,13 +17,29 @@ Dependencies:
 - agent.py module
 """
 
-import os, requests
+import os, ast, math, operator, functools, requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 from agent import AIAgent
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Shared HTTP session, so consecutive searches reuse the connection to SearxNG
+# instead of paying for a new TCP and TLS handshake every time. search_function
+# is a regular (blocking) function, which the agent runs in a worker thread
+_session = requests.Session()
+# Small connection pool, with a couple of quick retries for dropped connections
+_session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                                       max_retries=Retry(total=2, backoff_factor=0.3)))
+
+# Number of search results passed back to the agent
+SEARCH_TOP_K = 5
+
+# (connect, read) timeouts in seconds, so a slow SearxNG instance can't hang the agent
+SEARCH_TIMEOUT = (3.05, 10)
+
 def search_function(params):
     """
     Function that uses SearxNG to search the web for information.
@@ -56,46 +72,168 @@ def search_function(params):
     
     try:
         # Make the POST request to SearxNG
-        response = requests.post(base_url, data=post_data)
+        response = _session.post(base_url, data=post_data, timeout=SEARCH_TIMEOUT)
         
         # Check response status and format results
         if response.status_code == 200:
             search_results = response.json()
             
-            # Format the results for display
-            formatted_results = ""
+            results = search_results.get('results')
+            if not results:
+                return f"No results found for query: {query}"
             
-            if 'results' in search_results and search_results['results']:
-                formatted_results = "Search Results:\n\n"
-                
-                # Take the top 5 results or fewer if less are available
-                for i, result in enumerate(search_results['results'][:5], 1):
-                    title = result.get('title', 'No Title')
-                    url = result.get('url', 'No URL')
-                    content = result.get('content', 'No Description').strip()
-                    
-                    formatted_results += f"{i}. {title}\n"
-                    formatted_results += f"   URL: {url}\n"
-                    formatted_results += f"   Description: {content}\n\n"
-                
-                formatted_results += f"Total results found: {len(search_results['results'])}"
-            else:
-                formatted_results = f"No results found for query: {query}"
+            # Format the top 5 results (or fewer if less are available),
+            # collecting the pieces in a list and joining them once
+            parts = ["Search Results:\n\n"]
+            parts.extend(
+                f"{i}. {result.get('title', 'No Title')}\n"
+                f"   URL: {result.get('url', 'No URL')}\n"
+                f"   Description: {result.get('content', 'No Description').strip()}\n\n"
+                for i, result in enumerate(results[:SEARCH_TOP_K], 1)
+            )
+            parts.append(f"Total results found: {len(results)}")
             
-            return formatted_results
+            return "".join(parts)
         else:
             return f"Error: Could not complete search. Status code: {response.status_code}"
     
     except Exception as e:
         return f"Error performing search: {str(e)}"
 
+# Names a calculation may use: the public math functions and constants, plus a
+# few numeric builtins. Anything else is rejected before the expression runs
+_CALC_NAMES = {name: getattr(math, name) for name in dir(math) if not name.startswith('_')}
+_CALC_NAMES.update(abs=abs, round=round, min=min, max=max)
+
+# Operators a calculation may use
+_CALC_BINARY_OPS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod, ast.Pow: operator.pow,
+}
+_CALC_UNARY_OPS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+# Largest integer, in bits, a calculation may produce, and largest argument of
+# the combinatorial functions; computing bigger values could take practically
+# forever and hang the agent
+_CALC_MAX_INT_BITS = 10000
+_CALC_MAX_COMBINATORIAL_ARG = 1000
+_CALC_COMBINATORIAL = (math.factorial, math.comb, math.perm)
+
+def _check_size(value):
+    """
+    Rejects integers larger than _CALC_MAX_INT_BITS.
+    
+    Args:
+        value: A value computed by a calculation.
+    
+    Returns:
+        The value, if it is small enough.
+    
+    Raises:
+        ValueError: If the value is a too large integer.
+    """
+    if isinstance(value, int) and value.bit_length() > _CALC_MAX_INT_BITS:
+        raise ValueError("result too large")
+    return value
+
+def _node_name(node):
+    """Returns the name a Name or Attribute node uses, for error messages."""
+    return getattr(node, 'id', None) or getattr(node, 'attr', type(node).__name__)
+
+def _lookup_name(node):
+    """
+    Resolves a name (e.g. "pi") or math attribute (e.g. "math.sqrt") of a calculation.
+    
+    Args:
+        node (ast.Name or ast.Attribute): The name node.
+    
+    Returns:
+        The math function or constant the name refers to.
+    
+    Raises:
+        ValueError: If the name isn't one of _CALC_NAMES.
+    """
+    if isinstance(node, ast.Name) and node.id in _CALC_NAMES:
+        return _CALC_NAMES[node.id]
+    if (isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name)
+            and node.value.id == 'math' and node.attr in _CALC_NAMES):
+        return _CALC_NAMES[node.attr]
+    raise ValueError(f"unknown name: {_node_name(node)}")
+
+def _eval_node(node):
+    """
+    Evaluates a node of a parsed calculation, allowing only whitelisted syntax.
+    
+    Operand sizes are checked before every power and combinatorial function,
+    so no expression can run for an unbounded time.
+    
+    Args:
+        node (ast.AST): The node to evaluate.
+    
+    Returns:
+        The numeric value of the node.
+    
+    Raises:
+        ValueError: If the node isn't plain arithmetic or its result is too large.
+    """
+    if isinstance(node, ast.Expression):
+        return _eval_node(node.body)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, complex)):
+        return node.value
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _CALC_UNARY_OPS:
+        return _CALC_UNARY_OPS[type(node.op)](_eval_node(node.operand))
+    if isinstance(node, ast.BinOp) and type(node.op) in _CALC_BINARY_OPS:
+        left, right = _eval_node(node.left), _eval_node(node.right)
+        # An integer power has at least (bits of base - 1) * exponent bits
+        if (isinstance(node.op, ast.Pow) and isinstance(left, int) and isinstance(right, int)
+                and right > 0 and (abs(left).bit_length() - 1) * right > _CALC_MAX_INT_BITS):
+            raise ValueError("result too large")
+        return _check_size(_CALC_BINARY_OPS[type(node.op)](left, right))
+    if isinstance(node, ast.Call) and not node.keywords:
+        function = _lookup_name(node.func)
+        if not callable(function):
+            raise ValueError(f"not a function: {_node_name(node.func)}")
+        args = [_eval_node(arg) for arg in node.args]
+        if function in _CALC_COMBINATORIAL and any(abs(arg) > _CALC_MAX_COMBINATORIAL_ARG for arg in args):
+            raise ValueError("result too large")
+        return _check_size(function(*args))
+    if isinstance(node, (ast.Name, ast.Attribute)):
+        value = _lookup_name(node)
+        if callable(value):
+            raise ValueError(f"not a number: {_node_name(node)}")
+        return value
+    raise ValueError(f"unsupported syntax: {type(node).__name__}")
+
+@functools.lru_cache(maxsize=256)
+def _safe_eval(expression):
+    """
+    Evaluates a whitelisted mathematical expression.
+    
+    The expression is parsed into an AST and evaluated node by node, so only
+    numbers, arithmetic operators and math functions get through. Results
+    are cached per source string, so repeated expressions skip parsing and
+    evaluation entirely.
+    
+    Args:
+        expression (str): The expression to evaluate, e.g. "sqrt(2) * 3".
+    
+    Returns:
+        The numeric result.
+    
+    Raises:
+        ValueError: If the expression contains anything but plain arithmetic,
+            or its result is too large.
+    """
+    return _eval_node(ast.parse(expression.strip(), mode='eval'))
+
 def calculate_function(params):
     """
     Performs mathematical calculations based on the provided expression.
     
-    This function evaluates mathematical expressions using Python's eval function.
-    Note: In production environments, using eval can pose security risks and should
-    be replaced with a safer evaluation method.
+    Only arithmetic, numbers and math functions (e.g. "sqrt(16) + 2 ** 3" or
+    "math.pi * 2") are accepted; any other code is rejected instead of run,
+    as are expressions with huge integer results such as "9**9**9**9".
     
     Args:
         params (dict): Dictionary containing at least an "expression" key 
@@ -107,8 +245,8 @@ def calculate_function(params):
     expression = params.get("expression", "")
     print(f"Calculating: {expression}")
     try:
-        # Evaluate the expression (NOTE: eval has security implications in production)
-        result = eval(expression)
+        # Evaluate the expression through the whitelisting evaluator
+        result = _safe_eval(expression)
         return f"Result: {result}"
     except Exception as e:
         return f"Could not calculate expression: {str(e)}"
@@ -140,4 +278,7 @@ if __name__ == "__main__":
     agent.register_action("calculate", calculate_function)
     
     # Start the agent with an initial user input
-    agent.run("Hello, I need some help.")
\ No newline at end of file
+    try:
+        agent.run("Hello, I need some help.")
+    finally:
+        agent.close()
\ No newline at end of file